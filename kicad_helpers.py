@@ -6,42 +6,195 @@ No MCP imports — these are plain functions wired into server.py.
 from __future__ import annotations
 
 import json
+import os
+import threading
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
 import sexpdata
 
-from sexp_surgery import SexpDocument, SexpSpan
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+from sexp_surgery import (
+    _STRING_RE,
+    _TOKEN_RE,
+    SexpDocument,
+    SexpSpan,
+    atomic_write_bytes,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
 
-_ALWAYS_VISIBLE_PROPS = {"Reference", "Value"}
+_ALWAYS_VISIBLE_PROPS = frozenset({"Reference", "Value"})
 
 
 def _unwrap(value: Any) -> str:
     """Extract plain string from sexpdata value."""
+    # Quoted strings parse to str and sexpdata.Symbol subclasses str, so
+    # both return as-is; only numbers need a str() conversion.
     if isinstance(value, str):
         return value
-    if isinstance(value, sexpdata.Symbol):
-        return str(value)
     return str(value)
 
 
-def _prop_value(prop_span: SexpSpan) -> str:
+def _prop_value(prop_span: Optional[SexpSpan]) -> str:
     """Get the value (3rd element) from a property span's node."""
     if prop_span and len(prop_span.node) >= 3:
         return _unwrap(prop_span.node[2])
     return ""
 
 
+# Parsed schematics keyed by resolved path → (st_mtime_ns, st_size, doc).
+# Agents usually issue several calls against the same file, so reusing the
+# parse while the file is unchanged skips the dominant cost of each call.
+_SCHEMATIC_CACHE_SIZE = 16
+_schematic_cache: OrderedDict[str, tuple[int, int, SexpDocument]] = OrderedDict()
+_schematic_cache_lock = threading.Lock()
+
+
+def _load_schematic(path: Path, st: Optional[os.stat_result] = None) -> SexpDocument:
+    """Load a schematic, reusing a cached parse while the file is unchanged.
+
+    ``st`` is the caller's ``os.stat`` result, if it already has one, so the
+    cache check costs no extra syscall.  Returns a ``fork()`` of the cached
+    document: it shares the text/tree/spans (which are never mutated) and the
+    reference index, with its own empty replacement queue.
+    """
+    if st is None:
+        st = os.stat(path)
+    key = os.path.abspath(path)
+    with _schematic_cache_lock:
+        cached = _schematic_cache.get(key)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _schematic_cache.move_to_end(key)
+            return cached[2].fork()
+    # Parse outside the lock so sheets can be loaded from several threads.
+    base = _parse_schematic(path, st)
+    with _schematic_cache_lock:
+        _schematic_cache[key] = (st.st_mtime_ns, st.st_size, base)
+        _schematic_cache.move_to_end(key)
+        while len(_schematic_cache) > _SCHEMATIC_CACHE_SIZE:
+            _schematic_cache.popitem(last=False)
+    return base.fork()
+
+
+# Opt-in on-disk cache (KICAD_MCP_CACHE=1) so a fresh server process can skip
+# re-parsing unchanged schematics.  There is one entry per schematic path: a
+# pickled (mtime_ns, size) stamp followed by a pickle of (text, tree, spans),
+# overwritten whenever the file changes.  Bump _DISK_CACHE_FORMAT whenever
+# SexpDocument/SexpSpan internals change.
+_DISK_CACHE_FORMAT = 2
+
+
+def _disk_cache_file(path: Path) -> Optional[Path]:
+    """Return the pickle path for this schematic, or None if disabled."""
+    if os.environ.get("KICAD_MCP_CACHE") != "1":
+        return None
+    import hashlib  # deferred: only needed when the disk cache is enabled
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    key = f"{os.path.abspath(path)}|{sexpdata.__version__}|{_DISK_CACHE_FORMAT}"
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return Path(cache_home) / "kicad-edit-mcp" / f"{digest}.pkl"
+
+
+def _parse_schematic(path: Path, st: os.stat_result) -> SexpDocument:
+    """Parse ``path``, going through the on-disk cache when it is enabled.
+
+    Cache read/write failures are never fatal — they fall back to parsing.
+    """
+    cache_file = _disk_cache_file(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    if cache_file is not None:
+        import pickle  # deferred: only needed when the disk cache is enabled
+
+        try:
+            with open(cache_file, "rb") as fh:
+                # The stamp is its own pickle, so a stale entry is rejected
+                # without unpickling the tree.
+                if pickle.load(fh) == stamp:
+                    text, tree, span_list = pickle.load(fh)
+                    # Pickle preserves node identity within one dump, so
+                    # span.node is the unpickled tree node; only the id()
+                    # keys need rebuilding.
+                    return SexpDocument(
+                        text, tree, {id(sp.node): sp for sp in span_list}
+                    )
+        except FileNotFoundError:
+            pass
+        except Exception:
+            try:
+                cache_file.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    doc = SexpDocument.load(path)
+
+    if cache_file is not None:
+        try:
+            payload = (doc.text, doc.tree, list(doc.spans.values()))
+            data = pickle.dumps(stamp, protocol=5) + pickle.dumps(payload, protocol=5)
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(cache_file, data)
+        except Exception:
+            # OSError from the write, or a pickling error (e.g. recursion on a
+            # deeply nested tree).
+            pass
+    return doc
+
+
+def _open_schematic(schematic_path: str) -> tuple[SexpDocument, Path]:
+    """Load a schematic for a helper call, mapping failures to ValueError.
+
+    Raises:
+        ValueError: If the file does not exist or cannot be parsed.
+    """
+    path = Path(schematic_path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise ValueError(f"Schematic file not found: {schematic_path}") from None
+
+    try:
+        return _load_schematic(path, st), path
+    except Exception as exc:
+        raise ValueError(f"Failed to parse schematic: {exc}") from exc
+
+
+def _save_schematic(doc: SexpDocument, path: Path) -> None:
+    """Save ``doc`` and drop the now-stale cache entry for ``path``."""
+    try:
+        doc.save(path)
+    finally:
+        with _schematic_cache_lock:
+            _schematic_cache.pop(os.path.abspath(path), None)
+
+
 def _escape_sexp_string(s: str) -> str:
     """Escape for s-expression quoting."""
+    # Most values ("100nF", "USB_DP") need no escaping; four C-level `in`
+    # probes are cheaper than four replace() copies.
+    if "\\" not in s and '"' not in s and "\n" not in s and "\r" not in s:
+        return s
     return s.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
 
 
+def _quote_sexp_string(s: str) -> str:
+    """Return ``s`` escaped and wrapped in double quotes as an s-expr token."""
+    return f'"{_escape_sexp_string(s)}"'
+
+
 def _find_quoted_string(
     text: str, start: int, end: int, index: int = 0
 ) -> tuple[int, int] | None:
@@ -49,25 +202,11 @@ def _find_quoted_string(
 
     Returns (start_pos, end_pos) including the quote characters, or None.
     """
-    i = start
-    count = 0
-    while i < end:
-        if text[i] == '"':
-            q_start = i
-            i += 1
-            while i < end:
-                if text[i] == "\\":
-                    i += 2
-                    continue
-                if text[i] == '"':
-                    i += 1
-                    if count == index:
-                        return (q_start, i)
-                    count += 1
-                    break
-                i += 1
-        else:
-            i += 1
+    for count, m in enumerate(_STRING_RE.finditer(text, start, end)):
+        if m.group(1) is None:
+            return None  # unterminated
+        if count == index:
+            return m.span()
     return None
 
 
@@ -76,13 +215,16 @@ def _find_quoted_string(
 # ---------------------------------------------------------------------------
 
 
-def list_components(schematic_path: str, filter: Optional[str] = None) -> list[dict]:
+def list_components(
+    schematic_path: str, filter: Optional[str | list[str]] = None
+) -> list[dict]:
     """Return a summary list of all schematic symbols.
 
     Args:
         schematic_path: Path to a .kicad_sch file.
-        filter: Optional reference prefix, e.g. "C" for capacitors.  Only
-            symbols whose Reference starts with this string are returned.
+        filter: Optional reference prefix, e.g. "C" for capacitors, or a list
+            of prefixes such as ``["C", "R", "L"]``.  Only symbols whose
+            Reference starts with one of them are returned.
 
     Returns:
         List of dicts with keys ``reference``, ``value``, ``footprint``.
@@ -90,41 +232,53 @@ def list_components(schematic_path: str, filter: Optional[str] = None) -> list[d
     Raises:
         ValueError: If the file does not exist or cannot be parsed.
     """
-    path = Path(schematic_path)
-    if not path.exists():
-        raise ValueError(f"Schematic file not found: {schematic_path}")
+    return list(iter_components(schematic_path, filter))
 
-    try:
-        doc = SexpDocument.load(path)
-    except Exception as exc:
-        raise ValueError(f"Failed to parse schematic: {exc}") from exc
 
-    results: list[dict] = []
-    for sym_span in doc.find_all("symbol"):
-        node = sym_span.node
-        # Only schematic instances have lib_id, not lib_symbols definitions
-        has_lib_id = any(
-            isinstance(c, list) and c and str(c[0]) == "lib_id" for c in node[1:]
-        )
-        if not has_lib_id:
-            continue
+def iter_components(
+    schematic_path: str, filter: Optional[str | list[str]] = None
+) -> Iterator[dict]:
+    """Lazily yield the summaries :func:`list_components` returns.
 
-        ref_span = doc.get_property(sym_span, "Reference")
-        val_span = doc.get_property(sym_span, "Value")
-        fp_span = doc.get_property(sym_span, "Footprint")
+    The schematic is opened eagerly, so a missing or unparsable file raises
+    here; summaries are then built one symbol at a time, letting callers
+    stop early (e.g. on the first match) without materialising the rest.
 
-        ref = _prop_value(ref_span) if ref_span else ""
-        if filter is not None and not ref.startswith(filter):
-            continue
+    Raises:
+        ValueError: If the file does not exist or cannot be parsed.
+    """
+    doc, _ = _open_schematic(schematic_path)
 
-        results.append(
-            {
-                "reference": ref,
-                "value": _prop_value(val_span) if val_span else "",
-                "footprint": _prop_value(fp_span) if fp_span else "",
-            }
-        )
-    return results
+    # str.startswith() takes a tuple, so any number of prefixes is one C call
+    if not filter:
+        prefix = None
+    elif isinstance(filter, str):
+        prefix = filter
+    else:
+        prefix = tuple(filter)
+    return _iter_component_summaries(doc, prefix)
+
+
+def _iter_component_summaries(
+    doc: SexpDocument, prefix: Optional[str | tuple[str, ...]] = None
+) -> Iterator[dict]:
+    """Yield ``reference``/``value``/``footprint`` dicts for placed symbols.
+
+    Uses the document's memoized placed-symbol list and property maps, so
+    repeated calls on a cached parse walk no children.  Reference is checked
+    against ``prefix`` (a string or tuple of strings) before Value and
+    Footprint are looked up.
+    """
+    for sym_span in doc.placed_symbols():
+        props = doc.property_spans(sym_span)
+        ref = _prop_value(props.get("Reference"))
+        if prefix is not None and not ref.startswith(prefix):
+            continue
+        yield {
+            "reference": ref,
+            "value": _prop_value(props.get("Value")),
+            "footprint": _prop_value(props.get("Footprint")),
+        }
 
 
 def get_component(schematic_path: str, reference: str) -> dict:
@@ -148,14 +302,7 @@ def get_component(schematic_path: str, reference: str) -> dict:
         ValueError: If the file doesn't exist, can't be parsed, or the
             component is not found.
     """
-    path = Path(schematic_path)
-    if not path.exists():
-        raise ValueError(f"Schematic file not found: {schematic_path}")
-
-    try:
-        doc = SexpDocument.load(path)
-    except Exception as exc:
-        raise ValueError(f"Failed to parse schematic: {exc}") from exc
+    doc, _ = _open_schematic(schematic_path)
 
     unit_spans = doc.find_symbol_units(reference)
     if not unit_spans:
@@ -164,18 +311,21 @@ def get_component(schematic_path: str, reference: str) -> dict:
     # Read properties from first unit (canonical)
     sym_span = unit_spans[0]
     props: dict[str, Any] = {}
-    for child in sym_span.node[1:]:
-        if not (isinstance(child, list) and child and str(child[0]) == "property"):
-            continue
-        if len(child) < 2:
+    spans = doc.spans
+    for child in islice(sym_span.node, 1, None):
+        if not (
+            isinstance(child, list)
+            and len(child) >= 2
+            and str(child[0]) == "property"
+        ):
             continue
-        name = _unwrap(child[1])
-        child_span = doc.spans.get(id(child))
+        child_span = spans.get(id(child))
         if child_span is None:
             continue
-        value = _prop_value(child_span)
-        hidden = doc.is_property_hidden(child_span)
-        props[name] = {"value": value, "visible": not hidden}
+        props[_unwrap(child[1])] = {
+            "value": _unwrap(child[2]) if len(child) >= 3 else "",
+            "visible": not doc.is_property_hidden(child_span),
+        }
 
     if len(unit_spans) > 1:
         props["_units"] = {"value": str(len(unit_spans)), "visible": False}
@@ -213,35 +363,120 @@ def update_component(
         ValueError: If the file doesn't exist, can't be parsed, the
             component is not found, or ``"dnp"`` is passed.
     """
-    if "dnp" in properties:
-        raise ValueError(
-            "'dnp' flag is not supported — use in_bom/on_board or a custom property instead"
-        )
+    return bulk_update_components(
+        schematic_path, [{"reference": reference, "properties": properties}]
+    )
 
-    # Strip metadata keys injected by get_component (e.g. _units)
-    properties = {k: v for k, v in properties.items() if not k.startswith("_")}
 
-    path = Path(schematic_path)
-    if not path.exists():
-        raise ValueError(f"Schematic file not found: {schematic_path}")
+def bulk_update_components(
+    schematic_path: str, updates: list[dict[str, Any]]
+) -> str:
+    """Modify properties of several schematic symbols with one load and save.
 
-    try:
-        doc = SexpDocument.load(path)
-    except Exception as exc:
-        raise ValueError(f"Failed to parse schematic: {exc}") from exc
+    Each entry in ``updates`` selects components either by exact reference
+    or by reference prefix, and carries a ``properties`` dict with the same
+    semantics as :func:`update_component`::
+
+        [
+            {"reference": "C5", "properties": {"Value": "100nF"}},
+            {"reference_prefix": "R", "properties": {"Tolerance": "1%"}},
+        ]
+
+    When several entries select the same component, their properties are
+    merged in order (later entries win).  Nothing is written unless every
+    entry applies cleanly.
+
+    Args:
+        schematic_path: Path to a .kicad_sch file.
+        updates: List of update entries as described above.
+
+    Returns:
+        Human-readable success message, one line per updated component.
+
+    Raises:
+        ValueError: If ``updates`` is empty, the file doesn't exist or can't
+            be parsed, an entry is malformed, a component or prefix matches
+            nothing, or ``"dnp"`` is passed.
+    """
+    if not updates:
+        raise ValueError("No updates given — nothing to update")
+    for entry in updates:
+        if not isinstance(entry, dict):
+            raise ValueError(f"Update entry {entry!r} must be a dict")
+        if not isinstance(entry.get("properties"), dict):
+            raise ValueError(f"Update entry {entry!r} must have a 'properties' dict")
+        if ("reference" in entry) == ("reference_prefix" in entry):
+            raise ValueError(
+                f"Update entry {entry!r} must have exactly one of "
+                f"'reference' or 'reference_prefix'"
+            )
+        if "dnp" in entry["properties"]:
+            raise ValueError(
+                "'dnp' flag is not supported — use in_bom/on_board or a custom property instead"
+            )
+
+    doc, path = _open_schematic(schematic_path)
+
+    # Resolve every entry to concrete references, merging repeated targets so
+    # each property span is edited at most once.
+    merged: dict[str, dict[str, Any]] = {}
+    for entry in updates:
+        if "reference" in entry:
+            refs = [entry["reference"]]
+        else:
+            prefix = entry["reference_prefix"]
+            refs = [c["reference"] for c in _iter_component_summaries(doc, prefix)]
+            if not refs:
+                raise ValueError(
+                    f"No components with reference prefix '{prefix}' in {schematic_path}"
+                )
+        for ref in refs:
+            merged.setdefault(ref, {}).update(entry["properties"])
+
+    messages = [
+        _apply_component_update(doc, ref, props, schematic_path)
+        for ref, props in merged.items()
+    ]
+
+    if doc.has_edits:
+        try:
+            _save_schematic(doc, path)
+        except Exception as exc:
+            raise ValueError(f"Failed to save schematic: {exc}") from exc
+
+    return "\n".join(messages)
+
+
+def _apply_component_update(
+    doc: SexpDocument,
+    reference: str,
+    properties: dict[str, Any],
+    schematic_path: str,
+) -> str:
+    """Queue property edits for one component on ``doc`` without saving.
+
+    Returns the human-readable change summary for this component.
+    """
+    # Strip metadata keys injected by get_component (e.g. _units)
+    properties = {k: v for k, v in properties.items() if not k.startswith("_")}
 
     unit_spans = doc.find_symbol_units(reference)
     if not unit_spans:
         raise ValueError(f"Component '{reference}' not found in {schematic_path}")
 
     changes: list[str] = []
+    # Property name → span for every unit from the document's shared index;
+    # copied because the delete path pops entries.
+    unit_props = [dict(doc.property_spans(sym_span)) for sym_span in unit_spans]
+    new_props: list[list[str]] = [[] for _ in unit_spans]
+    at_strs: list[Optional[str]] = [None] * len(unit_spans)
 
     for key, value in properties.items():
         if value is None:
             # Delete the property from all units
             deleted = 0
-            for sym_span in unit_spans:
-                prop_span = doc.get_property(sym_span, key)
+            for props in unit_props:
+                prop_span = props.pop(key, None)
                 if prop_span is not None:
                     doc.delete_span(prop_span)
                     deleted += 1
@@ -265,18 +500,28 @@ def update_component(
                 raw_value = str(value)
                 explicit_visible = None
 
+            # Escaped/quoted forms are the same for every unit; build them once.
+            quoted_key = _quote_sexp_string(key)
+            quoted_value = _quote_sexp_string(raw_value)
+            default_hide = key not in _ALWAYS_VISIBLE_PROPS
+            hide = (not explicit_visible) if explicit_visible is not None else default_hide
+            hide_str = " (hide yes)" if hide else ""
+
             reported = False
-            for sym_span in unit_spans:
-                prop_span = doc.get_property(sym_span, key)
+            for unit_idx, (sym_span, props) in enumerate(zip(unit_spans, unit_props)):
+                prop_span = props.get(key)
 
                 if prop_span is not None:
                     # Property exists — surgically replace value
                     vs = doc.get_property_value_span(prop_span)
                     if vs is not None:
                         old_val = vs[2]
-                        doc.replace_bytes(vs[0], vs[1], f'"{_escape_sexp_string(raw_value)}"')
+                        changed = _replace_if_different(doc, vs[:2], quoted_value)
                         if not reported:
-                            changes.append(f"'{key}': '{old_val}' -> '{raw_value}'")
+                            if changed:
+                                changes.append(f"'{key}': '{old_val}' -> '{raw_value}'")
+                            else:
+                                changes.append(f"'{key}': '{old_val}' (unchanged)")
                             reported = True
                     elif not reported:
                         changes.append(f"'{key}': (could not locate value span)")
@@ -286,30 +531,24 @@ def update_component(
                     if explicit_visible is not None:
                         _update_property_visibility(doc, prop_span, explicit_visible)
                 else:
-                    # New property — insert before symbol's closing paren
-                    default_hide = key not in _ALWAYS_VISIBLE_PROPS
-                    hide = (not explicit_visible) if explicit_visible is not None else default_hide
-
-                    at_str = _get_symbol_at(sym_span)
-                    hide_str = " (hide yes)" if hide else ""
-                    new_prop = (
-                        f'\n    (property "{_escape_sexp_string(key)}" '
-                        f'"{_escape_sexp_string(raw_value)}" {at_str}\n'
+                    # New property — collected and inserted once per unit below
+                    if at_strs[unit_idx] is None:
+                        at_strs[unit_idx] = _get_symbol_at(sym_span)
+                    new_props[unit_idx].append(
+                        f"\n    (property {quoted_key} {quoted_value} {at_strs[unit_idx]}\n"
                         f"      (effects (font (size 1.27 1.27)){hide_str})\n"
                         f"    )"
                     )
-                    doc.insert_before_end(sym_span, new_prop)
                     if not reported:
                         changes.append(f"added '{key}'='{raw_value}'")
                         reported = True
 
-    n_units = len(unit_spans)
-
-    try:
-        doc.save(path)
-    except Exception as exc:
-        raise ValueError(f"Failed to save schematic: {exc}") from exc
+    # One insertion per unit before its closing paren, in request order
+    for sym_span, blocks in zip(unit_spans, new_props):
+        if blocks:
+            doc.insert_before_end(sym_span, "".join(blocks))
 
+    n_units = len(unit_spans)
     changes_str = "; ".join(changes) if changes else "no changes"
     units_note = f" ({n_units} units)" if n_units > 1 else ""
     return f"Updated {reference}{units_note}: {changes_str}"
@@ -317,10 +556,9 @@ def update_component(
 
 def _get_symbol_at(sym_span: SexpSpan) -> str:
     """Extract (at ...) string from a symbol node, defaulting to (at 0 0 0)."""
-    for child in sym_span.node[1:]:
+    for child in islice(sym_span.node, 1, None):
         if isinstance(child, list) and child and str(child[0]) == "at":
-            parts = [str(x) for x in child[1:]]
-            return f"(at {' '.join(parts)})"
+            return f"(at {' '.join(str(x) for x in islice(child, 1, None))})"
     return "(at 0 0 0)"
 
 
@@ -329,81 +567,50 @@ def _update_property_visibility(
 ) -> None:
     """Toggle the hide flag in a property span using text scanning.
 
-    Manipulates the text directly within the property span's effects section.
+    The parsed node (via the memoized ``is_property_hidden``) decides first
+    whether anything needs to change, so no-op requests never touch the
+    text.  Otherwise manipulates the text directly within the property
+    span's effects section.
     """
+    if doc.is_property_hidden(prop_span) != visible:
+        return  # already in the requested state
+
     text = doc.text
     start = prop_span.start
     end = prop_span.end
-    prop_text = text[start:end]
 
     # Find the effects section within the property text
-    effects_idx = prop_text.find("(effects")
-    if effects_idx == -1:
+    effects_start = text.find("(effects", start, end)
+    if effects_start == -1:
         # No effects section, nothing to do for hiding
         return
 
-    effects_start = start + effects_idx
-
     # Find the closing paren of effects section
-    depth = 0
-    i = effects_start
-    in_str = False
-    while i < end:
-        ch = text[i]
-        if in_str:
-            if ch == "\\":
-                i += 2
-                continue
-            if ch == '"':
-                in_str = False
-            i += 1
-            continue
-        if ch == '"':
-            in_str = True
-            i += 1
-            continue
-        if ch == "(":
-            depth += 1
-        elif ch == ")":
-            depth -= 1
-            if depth == 0:
-                effects_end = i + 1
-                break
-        i += 1
-    else:
+    effects_end = _find_node_end(text, effects_start, end)
+    if effects_end is None:
         return
 
-    effects_text = text[effects_start:effects_end]
-
     if not visible:
-        # Need to hide: add (hide yes) or bare hide if not already present
-        # Check if already hidden
-        if "(hide yes)" in effects_text or " hide)" in effects_text:
-            return  # already hidden
-        # Insert before effects closing paren
+        # Need to hide: insert (hide yes) before effects closing paren
         insert_pos = effects_end - 1
         doc.replace_bytes(insert_pos, insert_pos, " (hide yes)")
-    else:
-        # Need to show: remove hide token
-        # Handle (hide yes) form
-        hide_yes_pos = effects_text.find(" (hide yes)")
-        if hide_yes_pos != -1:
-            abs_pos = effects_start + hide_yes_pos
-            doc.replace_bytes(abs_pos, abs_pos + len(" (hide yes)"), "")
-            return
-        # Handle bare " hide)" form (KiCad 6)
-        # Look for " hide)" at end of effects
-        bare_pos = effects_text.rfind(" hide)")
-        if bare_pos != -1:
-            abs_pos = effects_start + bare_pos
-            # Replace " hide)" with ")"
-            doc.replace_bytes(abs_pos, abs_pos + len(" hide)"), ")")
-            return
-        # Handle "hide" as Symbol just before closing paren
-        bare2_pos = effects_text.rfind(" hide\n")
-        if bare2_pos != -1:
-            abs_pos = effects_start + bare2_pos
-            doc.replace_bytes(abs_pos, abs_pos + len(" hide\n"), "\n")
+        return
+
+    # Need to show: remove the hide token, searching only the effects range
+    # Handle (hide yes) form
+    pos = text.find(" (hide yes)", effects_start, effects_end)
+    if pos != -1:
+        doc.replace_bytes(pos, pos + len(" (hide yes)"), "")
+        return
+    # Handle bare " hide)" form (KiCad 6) at end of effects
+    pos = text.rfind(" hide)", effects_start, effects_end)
+    if pos != -1:
+        doc.replace_bytes(pos, pos + len(" hide)"), ")")
+        return
+    # Handle "hide" as Symbol just before closing paren
+    pos = text.rfind(" hide\n", effects_start, effects_end)
+    if pos != -1:
+        doc.replace_bytes(pos, pos + len(" hide\n"), "\n")
 
 
 def update_schematic_info(
@@ -432,14 +639,7 @@ def update_schematic_info(
     Raises:
         ValueError: If the file doesn't exist or cannot be parsed/saved.
     """
-    path = Path(schematic_path)
-    if not path.exists():
-        raise ValueError(f"Schematic file not found: {schematic_path}")
-
-    try:
-        doc = SexpDocument.load(path)
-    except Exception as exc:
-        raise ValueError(f"Failed to parse schematic: {exc}") from exc
+    doc, path = _open_schematic(schematic_path)
 
     tb_span = doc.find_title_block()
     if tb_span is None:
@@ -459,18 +659,22 @@ def update_schematic_info(
         fields.append(("company", company, f"company='{company}'"))
 
     for sexp_key, new_val, label in fields:
-        _update_title_block_field(doc, tb_span, sexp_key, new_val)
+        if not _update_title_block_field(doc, tb_span, sexp_key, new_val):
+            label += " (unchanged)"
         updated.append(label)
 
     # Author is special: (comment 1 "...")
     if author is not None:
-        _update_title_block_comment(doc, tb_span, 1, author)
-        updated.append(f"author='{author}' (comment 1)")
+        label = f"author='{author}' (comment 1)"
+        if not _update_title_block_comment(doc, tb_span, 1, author):
+            label += " (unchanged)"
+        updated.append(label)
 
-    try:
-        doc.save(path)
-    except Exception as exc:
-        raise ValueError(f"Failed to save schematic: {exc}") from exc
+    if doc.has_edits:
+        try:
+            _save_schematic(doc, path)
+        except Exception as exc:
+            raise ValueError(f"Failed to save schematic: {exc}") from exc
 
     updated_str = ", ".join(updated) if updated else "no fields provided"
     return f"Updated title block: {updated_str}"
@@ -478,8 +682,11 @@ def update_schematic_info(
 
 def _update_title_block_field(
     doc: SexpDocument, tb_span: SexpSpan, key: str, new_val: str
-) -> None:
-    """Update or insert a simple title_block field like (title "...") or (rev "...")."""
+) -> bool:
+    """Update or insert a simple title_block field like (title "...") or (rev "...").
+
+    Returns True if an edit was queued, False if the field already matches.
+    """
     text = doc.text
     tb_text = text[tb_span.start:tb_span.end]
 
@@ -492,22 +699,26 @@ def _update_title_block_field(
         # Find the quoted string value within this field
         field_end = _find_node_end(text, abs_field_start, tb_span.end)
         if field_end is None:
-            return
+            return False
         # Find the first quoted string in this field
         qs = _find_quoted_string(text, abs_field_start, field_end, index=0)
-        if qs is not None:
-            doc.replace_bytes(qs[0], qs[1], f'"{_escape_sexp_string(new_val)}"')
-    else:
-        # Field doesn't exist, insert before title_block closing paren
-        doc.insert_before_end(
-            tb_span, f'\n    ({key} "{_escape_sexp_string(new_val)}")'
+        return qs is not None and _replace_if_different(
+            doc, qs, _quote_sexp_string(new_val)
         )
+    # Field doesn't exist, insert before title_block closing paren
+    doc.insert_before_end(
+        tb_span, f"\n    ({key} {_quote_sexp_string(new_val)})"
+    )
+    return True
 
 
 def _update_title_block_comment(
     doc: SexpDocument, tb_span: SexpSpan, number: int, new_val: str
-) -> None:
-    """Update or insert (comment N "value") in title_block."""
+) -> bool:
+    """Update or insert (comment N "value") in title_block.
+
+    Returns True if an edit was queued, False if the comment already matches.
+    """
     text = doc.text
     tb_text = text[tb_span.start:tb_span.end]
 
@@ -518,17 +729,33 @@ def _update_title_block_comment(
         abs_field_start = tb_span.start + field_idx
         field_end = _find_node_end(text, abs_field_start, tb_span.end)
         if field_end is None:
-            return
+            return False
         # The quoted string is the 2nd quoted string (after key="comment", number is not quoted)
         # Actually: (comment 1 "value") — only 1 quoted string
         qs = _find_quoted_string(text, abs_field_start, field_end, index=0)
-        if qs is not None:
-            doc.replace_bytes(qs[0], qs[1], f'"{_escape_sexp_string(new_val)}"')
-    else:
-        doc.insert_before_end(
-            tb_span,
-            f'\n    (comment {number} "{_escape_sexp_string(new_val)}")',
+        return qs is not None and _replace_if_different(
+            doc, qs, _quote_sexp_string(new_val)
         )
+    doc.insert_before_end(
+        tb_span,
+        f"\n    (comment {number} {_quote_sexp_string(new_val)})",
+    )
+    return True
+
+
+def _replace_if_different(
+    doc: SexpDocument, quoted: tuple[int, int], new_text: str
+) -> bool:
+    """Replace the quoted string at ``quoted`` with ``new_text`` unless identical.
+
+    ``new_text`` is the already escaped and quoted replacement.  Comparing
+    on-disk bytes means an edit is queued only when the file would actually
+    change.  Returns True if an edit was queued.
+    """
+    if doc.text[quoted[0]:quoted[1]] == new_text:
+        return False
+    doc.replace_bytes(quoted[0], quoted[1], new_text)
+    return True
 
 
 def _find_node_end(text: str, start: int, limit: int) -> int | None:
@@ -536,29 +763,15 @@ def _find_node_end(text: str, start: int, limit: int) -> int | None:
     if start >= limit or text[start] != "(":
         return None
     depth = 0
-    i = start
-    in_str = False
-    while i < limit:
-        ch = text[i]
-        if in_str:
-            if ch == "\\":
-                i += 2
-                continue
-            if ch == '"':
-                in_str = False
-            i += 1
-            continue
-        if ch == '"':
-            in_str = True
-            i += 1
-            continue
+    # The regex engine skips whole strings in C; only parens reach Python.
+    for m in _TOKEN_RE.finditer(text, start, limit):
+        ch = text[m.start()]
         if ch == "(":
             depth += 1
         elif ch == ")":
             depth -= 1
             if depth == 0:
-                return i + 1
-        i += 1
+                return m.end()
     return None
 
 
@@ -578,59 +791,263 @@ def rename_net(schematic_path: str, old_name: str, new_name: str) -> str:
     Raises:
         ValueError: If the file doesn't exist or cannot be parsed/saved.
     """
-    path = Path(schematic_path)
-    if not path.exists():
-        raise ValueError(f"Schematic file not found: {schematic_path}")
+    if old_name == new_name:
+        if not Path(schematic_path).exists():
+            raise ValueError(f"Schematic file not found: {schematic_path}")
+        return f"Old and new name are both '{old_name}' — nothing changed"
 
-    try:
-        doc = SexpDocument.load(path)
-    except Exception as exc:
-        raise ValueError(f"Failed to parse schematic: {exc}") from exc
+    doc, path = _open_schematic(schematic_path)
 
-    count = 0
-    for label_type in ("label", "hierarchical_label", "global_label"):
-        for label_span in doc.find_labels(label_type, text=old_name):
-            # The label text is the second element (index 1) of the node
-            # Scan for first quoted string in the label span
-            vs = _find_quoted_string(
-                doc.text, label_span.start, label_span.end, index=0
-            )
-            if vs is not None:
-                doc.replace_bytes(vs[0], vs[1], f'"{_escape_sexp_string(new_name)}"')
-                count += 1
+    count = _apply_net_renames(doc, {old_name: new_name})[old_name]
 
     if count == 0:
         return f"No labels named '{old_name}' found — nothing changed"
 
     try:
-        doc.save(path)
+        _save_schematic(doc, path)
     except Exception as exc:
         raise ValueError(f"Failed to save schematic: {exc}") from exc
 
     return f"Renamed {count} label(s) from '{old_name}' to '{new_name}'"
 
 
+def bulk_rename_nets(schematic_path: str, renames: dict[str, str]) -> str:
+    """Rename several nets with one load and save.
+
+    Renames are applied simultaneously against the original label text, so
+    ``{"A": "B", "B": "A"}`` swaps the two nets rather than merging them.
+
+    Args:
+        schematic_path: Path to a .kicad_sch file.
+        renames: Mapping of exact old label text → new label text.
+
+    Returns:
+        Human-readable success message, one line per rename.
+
+    Raises:
+        ValueError: If the file doesn't exist or cannot be parsed/saved.
+    """
+    doc, path = _open_schematic(schematic_path)
+
+    counts = _apply_net_renames(doc, renames)
+
+    if doc.has_edits:
+        try:
+            _save_schematic(doc, path)
+        except Exception as exc:
+            raise ValueError(f"Failed to save schematic: {exc}") from exc
+
+    lines: list[str] = []
+    for old_name, new_name in renames.items():
+        count = counts.get(old_name, 0)
+        if old_name == new_name:
+            lines.append(f"Old and new name are both '{old_name}' — nothing changed")
+        elif count:
+            lines.append(f"Renamed {count} label(s) from '{old_name}' to '{new_name}'")
+        else:
+            lines.append(f"No labels named '{old_name}' found — nothing changed")
+    return "\n".join(lines)
+
+
+# Thread cap for multi-sheet operations; parsing is mostly pure Python, so
+# more threads than this only add contention.
+_MAX_SHEET_WORKERS = min(8, os.cpu_count() or 1)
+
+
+# Property naming the child file of a (sheet ...) node; KiCad 6 spells it
+# with a space.
+_SHEETFILE_PROPERTIES = ("Sheetfile", "Sheet file")
+
+
+def _sheet_files(doc: SexpDocument) -> list[str]:
+    """Return the Sheetfile of every ``(sheet ...)`` node in ``doc``."""
+    files: list[str] = []
+    for span in doc.find_all("sheet"):
+        props = doc.property_spans(span)
+        prop = next(
+            (props[name] for name in _SHEETFILE_PROPERTIES if name in props), None
+        )
+        filename = _prop_value(prop)
+        if filename:
+            files.append(filename)
+    return files
+
+
+def _project_sheets(
+    project_path: str, pool: Executor
+) -> tuple[Path, list[tuple[SexpDocument, Path]]]:
+    """Find and load the schematic sheets of a project.
+
+    The hierarchy is followed from the root schematic (named after the
+    .kicad_pro) through each ``(sheet ...)`` node's Sheetfile property, whose
+    path is relative to the referencing sheet.  Each level of the hierarchy
+    is parsed in ``pool``.  Without a project file or root schematic, the
+    ``*.kicad_sch`` files directly in the directory are loaded instead.
+
+    Returns:
+        (project directory, (document, path) per sheet in hierarchy order).
+
+    Raises:
+        ValueError: If a referenced sheet is missing or cannot be parsed.
+    """
+    path = Path(project_path)
+    if path.is_dir():
+        root = path
+        projects = sorted(root.glob("*.kicad_pro"))
+        project = projects[0] if len(projects) == 1 else None
+    else:
+        root = path.parent
+        project = path if path.suffix == ".kicad_pro" else None
+    root_sheet = project.with_suffix(".kicad_sch") if project else None
+    if root_sheet is None or not root_sheet.is_file():
+        flat = sorted(root.glob("*.kicad_sch"))
+        return root, list(pool.map(lambda p: _open_schematic(str(p)), flat))
+
+    loaded: list[tuple[SexpDocument, Path]] = []
+    seen = {os.path.abspath(root_sheet)}
+    level = [root_sheet]
+    while level:
+        docs = list(pool.map(lambda p: _open_schematic(str(p)), level))
+        loaded.extend(docs)
+        level = []
+        for doc, sheet in docs:
+            for filename in _sheet_files(doc):
+                child = sheet.parent / filename
+                key = os.path.abspath(child)
+                if key not in seen:
+                    seen.add(key)
+                    level.append(child)
+    return root, loaded
+
+
+def rename_net_project(project_path: str, old_name: str, new_name: str) -> str:
+    """Rename net labels in every schematic sheet of a project.
+
+    Sheets are found by following the hierarchy from the root schematic (see
+    ``_project_sheets``); each level is parsed, then searched and rendered,
+    in parallel threads.  Every changed sheet is rendered before the first
+    one is written, so a parse or render error leaves all files untouched.
+    The writes themselves are one atomic replace per file, not one for the
+    project: if a write fails, the sheets before it keep the new name and
+    the error lists which sheets were and were not saved.
+
+    Args:
+        project_path: A project directory or a file inside it (e.g. the
+            .kicad_pro).
+        old_name: Exact net label text to find.
+        new_name: Replacement net label text.
+
+    Returns:
+        Human-readable success message with per-sheet label counts.
+
+    Raises:
+        ValueError: If the project has no sheets, or a sheet cannot be
+            parsed/saved.
+    """
+    # Deferred: concurrent.futures pulls in logging and is only needed here.
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _rename_in(loaded: tuple[SexpDocument, Path]) -> tuple[Path, int, bytes]:
+        doc, path = loaded
+        count = _apply_net_renames(doc, {old_name: new_name})[old_name]
+        return path, count, doc.render().encode("utf-8") if count else b""
+
+    with ThreadPoolExecutor(max_workers=_MAX_SHEET_WORKERS) as pool:
+        root, sheets = _project_sheets(project_path, pool)
+        if not sheets:
+            raise ValueError(f"No .kicad_sch files found under {root}")
+        if old_name == new_name:
+            return f"Old and new name are both '{old_name}' — nothing changed"
+        changed = [r for r in pool.map(_rename_in, sheets) if r[1]]
+
+    if not changed:
+        return (
+            f"No labels named '{old_name}' found in {len(sheets)} sheet(s) "
+            f"— nothing changed"
+        )
+
+    def _rel(path: Path) -> str:
+        return str(os.path.relpath(path, root))
+
+    lines: list[str] = []
+    total = 0
+    for i, (path, count, data) in enumerate(changed):
+        try:
+            atomic_write_bytes(path, data)
+        except Exception as exc:
+            saved = ", ".join(_rel(p) for p, _, _ in changed[:i]) or "none"
+            unsaved = ", ".join(_rel(p) for p, _, _ in changed[i:])
+            raise ValueError(
+                f"Failed to save schematic {path}: {exc} "
+                f"(already saved: {saved}; not saved: {unsaved})"
+            ) from exc
+        finally:
+            with _schematic_cache_lock:
+                _schematic_cache.pop(os.path.abspath(path), None)
+        total += count
+        lines.append(f"  {_rel(path)}: {count}")
+
+    header = (
+        f"Renamed {total} label(s) from '{old_name}' to '{new_name}' "
+        f"in {len(lines)} of {len(sheets)} sheet(s):"
+    )
+    return "\n".join([header, *lines])
+
+
+_LABEL_TYPES = ("label", "hierarchical_label", "global_label")
+
+
+def _apply_net_renames(doc: SexpDocument, renames: dict[str, str]) -> dict[str, int]:
+    """Queue label text replacements on ``doc`` without saving.
+
+    Label lookups go through the document's text → spans index, which is
+    built once per parse, so K renames cost O(labels + K) instead of
+    O(labels · K).
+
+    Returns:
+        Mapping of old name → number of labels renamed.
+    """
+    counts: dict[str, int] = {}
+    for old_name, new_name in renames.items():
+        count = 0
+        if old_name != new_name:
+            new_text = _quote_sexp_string(new_name)
+            for label_type in _LABEL_TYPES:
+                for label_span in doc.find_labels(label_type, old_name):
+                    # The label text is the second element (index 1) of the node
+                    # Scan for first quoted string in the label span
+                    vs = _find_quoted_string(
+                        doc.text, label_span.start, label_span.end, index=0
+                    )
+                    if vs is not None:
+                        doc.replace_bytes(vs[0], vs[1], new_text)
+                        count += 1
+        counts[old_name] = count
+    return counts
+
+
 # ---------------------------------------------------------------------------
 # Project helpers (.kicad_pro — plain JSON)
 # ---------------------------------------------------------------------------
 
-_NETCLASS_FIELD_MAP = {
-    "bus_width": "bus_width",
-    "clearance": "clearance",
-    "diff_pair_gap": "diff_pair_gap",
-    "diff_pair_via_gap": "diff_pair_via_gap",
-    "diff_pair_width": "diff_pair_width",
-    "line_style": "line_style",
-    "microvia_diameter": "microvia_diameter",
-    "microvia_drill": "microvia_drill",
-    "pcb_color": "pcb_color",
-    "priority": "priority",
-    "schematic_color": "schematic_color",
-    "track_width": "track_width",
-    "via_diameter": "via_diameter",
-    "via_drill": "via_drill",
-    "wire_width": "wire_width",
-}
+# Rule keys reported by list_net_classes (file key == reported key).
+_NETCLASS_FIELDS: frozenset[str] = frozenset({
+    "bus_width",
+    "clearance",
+    "diff_pair_gap",
+    "diff_pair_via_gap",
+    "diff_pair_width",
+    "line_style",
+    "microvia_diameter",
+    "microvia_drill",
+    "pcb_color",
+    "priority",
+    "schematic_color",
+    "track_width",
+    "via_diameter",
+    "via_drill",
+    "wire_width",
+})
 
 _NETCLASS_DEFAULTS: dict[str, Any] = {
     "bus_width": 12,
@@ -651,25 +1068,82 @@ _NETCLASS_DEFAULTS: dict[str, Any] = {
 }
 
 
-def _load_project(project_path: str) -> tuple[dict, Path]:
+# Parsed .kicad_pro data keyed by absolute path → (st_mtime_ns, st_size, data),
+# mirroring the schematic cache so a session of read-only calls parses once.
+_PROJECT_CACHE_SIZE = 8
+_project_cache: OrderedDict[str, tuple[int, int, dict]] = OrderedDict()
+_project_cache_lock = threading.Lock()
+
+
+def _parse_project(path: Path) -> dict:
+    """Parse a .kicad_pro file with orjson when available.
+
+    Raises:
+        ValueError: If the file is not valid JSON.
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(path.read_bytes())
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:  # orjson's error subclasses this
+        raise ValueError(f"Invalid JSON in project file: {exc}") from exc
+
+
+def _load_project(project_path: str, mutable: bool = True) -> tuple[dict, Path]:
     """Load a .kicad_pro JSON file and return (data, path).
 
+    Read-only callers pass ``mutable=False`` and get a cached dict, reused
+    while the file's mtime and size are unchanged; they must not modify it.
+    Otherwise the file is parsed afresh: re-parsing is several times cheaper
+    than deep-copying the nested dict, and edits never leak into the cache.
+
     Raises:
         ValueError: If the file does not exist or is not valid JSON.
     """
     path = Path(project_path)
-    if not path.exists():
-        raise ValueError(f"Project file not found: {project_path}")
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
-        raise ValueError(f"Invalid JSON in project file: {exc}") from exc
+        st = os.stat(path)
+    except OSError:
+        raise ValueError(f"Project file not found: {project_path}") from None
+    if mutable:
+        return _parse_project(path), path
+    key = os.path.abspath(path)
+    with _project_cache_lock:
+        cached = _project_cache.get(key)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _project_cache.move_to_end(key)
+            return cached[2], path
+    # Parse outside the lock, as for schematics.
+    data = _parse_project(path)
+    with _project_cache_lock:
+        _project_cache[key] = (st.st_mtime_ns, st.st_size, data)
+        _project_cache.move_to_end(key)
+        while len(_project_cache) > _PROJECT_CACHE_SIZE:
+            _project_cache.popitem(last=False)
     return data, path
 
 
 def _save_project(data: dict, path: Path) -> None:
-    """Save project data back to disk as pretty JSON."""
-    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    """Save project data back to disk as pretty JSON.
+
+    Both backends write 2-space indented JSON with a trailing newline and
+    the same data, but not always the same bytes.  orjson writes non-ASCII
+    text as raw UTF-8 where json escapes it (``\\u00b5``), and formats some
+    floats differently (``0.00001`` for ``1e-05``, ``1e20`` for ``1e+20``).
+    orjson also cannot handle integers wider than 64 bits: it parses them
+    as floats and refuses to serialize them.
+    """
+    if orjson is not None:
+        buf = orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+        )
+    else:
+        buf = (json.dumps(data, indent=2) + "\n").encode("utf-8")
+    try:
+        atomic_write_bytes(path, buf)
+    finally:
+        with _project_cache_lock:
+            _project_cache.pop(os.path.abspath(path), None)
 
 
 def list_net_classes(project_path: str) -> list[dict]:
@@ -687,36 +1161,36 @@ def list_net_classes(project_path: str) -> list[dict]:
     Raises:
         ValueError: If the file doesn't exist or is not valid JSON.
     """
-    data, _ = _load_project(project_path)
+    data, _ = _load_project(project_path, mutable=False)
 
     net_settings: dict = data.get("net_settings", {})
 
     # KiCad 6+ stores net classes under net_settings.classes
     raw_classes: list[dict] = net_settings.get("classes", [])
 
+    # KiCad 9 patterns stored in netclass_patterns[] at net_settings level;
+    # bucket them by class in one pass instead of rescanning per class.
+    patterns_by_class: dict[str, list[str]] = {}
+    for p in net_settings.get("netclass_patterns", []):
+        if "pattern" in p:
+            patterns_by_class.setdefault(p.get("netclass"), []).append(p["pattern"])
+
     results: list[dict] = []
     for cls in raw_classes:
         entry: dict = {}
         # Name
         entry["name"] = cls.get("name", "")
-        # Legacy KiCad 6 patterns stored inside class dict
-        entry["patterns"] = list(cls.get("nets", []))
+        # Legacy KiCad 6 patterns stored inside class dict, then KiCad 9 ones
+        entry["patterns"] = [
+            *cls.get("nets", []),
+            *patterns_by_class.get(entry["name"], ()),
+        ]
         # Numeric/string rule fields — include whatever is present
-        for field_name in _NETCLASS_FIELD_MAP:
-            if field_name in cls:
-                entry[field_name] = cls[field_name]
+        # C-level set intersection; sorted() keeps the alphabetical key order
+        for field_name in sorted(_NETCLASS_FIELDS & cls.keys()):
+            entry[field_name] = cls[field_name]
         results.append(entry)
 
-    # KiCad 9 patterns stored in netclass_patterns[] at net_settings level
-    netclass_patterns: list[dict] = net_settings.get("netclass_patterns", [])
-    for entry in results:
-        cls_patterns = [
-            p["pattern"]
-            for p in netclass_patterns
-            if p.get("netclass") == entry["name"] and "pattern" in p
-        ]
-        entry["patterns"].extend(cls_patterns)
-
     return results
 
 
@@ -724,7 +1198,7 @@ def update_net_class(
     project_path: str,
     class_name: str,
     rules: Optional[dict[str, Any]] = None,
-    add_pattern: Optional[str] = None,
+    add_pattern: Optional[str | list[str]] = None,
 ) -> str:
     """Create or update a net class in a KiCad project file.
 
@@ -737,7 +1211,8 @@ def update_net_class(
         rules: Dict of rule overrides such as
             ``{"track_width": 0.5, "clearance": 0.2}``.
         add_pattern: A wildcard net pattern to add to the class, e.g.
-            ``"USB_D?"``.  Duplicates are silently ignored.
+            ``"USB_D?"``, or a list of patterns.  Duplicates are silently
+            ignored.
 
     Returns:
         Human-readable success message.
@@ -771,6 +1246,7 @@ def update_net_class(
         classes.append(target)
 
     changes: list[str] = []
+    dirty = created
 
     if rules:
         for field_name, value in rules.items():
@@ -778,20 +1254,27 @@ def update_net_class(
             target[field_name] = value
             if old != value:
                 changes.append(f"{field_name}: {old!r} -> {value!r}")
+                dirty = True
 
     if add_pattern is not None:
+        new_patterns = [add_pattern] if isinstance(add_pattern, str) else add_pattern
         patterns: list = net_settings.setdefault("netclass_patterns", [])
-        exists = any(
-            p.get("netclass") == class_name and p.get("pattern") == add_pattern
-            for p in patterns
-        )
-        if not exists:
-            patterns.append({"netclass": class_name, "pattern": add_pattern})
-            changes.append(f"added pattern '{add_pattern}'")
-        else:
-            changes.append(f"pattern '{add_pattern}' already present")
+        # One pass builds the membership set; each added pattern is then O(1)
+        # instead of rescanning the list.
+        existing = {
+            p.get("pattern") for p in patterns if p.get("netclass") == class_name
+        }
+        for pattern in new_patterns:
+            if pattern not in existing:
+                patterns.append({"netclass": class_name, "pattern": pattern})
+                existing.add(pattern)
+                changes.append(f"added pattern '{pattern}'")
+                dirty = True
+            else:
+                changes.append(f"pattern '{pattern}' already present")
 
-    _save_project(data, path)
+    if dirty:
+        _save_project(data, path)
 
     action = "Created" if created else "Updated"
     changes_str = "; ".join(changes) if changes else "no rule changes"
@@ -12,8 +12,6 @@ from typing import Any, Optional
 
 from fastmcp import FastMCP
 
-import kicad_helpers
-
 # ---------------------------------------------------------------------------
 # Config: env-var-driven tool enable/disable
 # ---------------------------------------------------------------------------
@@ -22,23 +20,32 @@ _KNOWN_TOOLS = {
     "list_components",
     "get_component",
     "update_component",
+    "bulk_update_components",
     "update_schematic_info",
     "rename_net",
+    "bulk_rename_nets",
+    "rename_net_project",
     "list_net_classes",
     "update_net_class",
 }
 
-_raw = os.environ.get("DISABLED_TOOLS", "")
-_disabled = set(t.strip() for t in _raw.split(",") if t.strip())
 
-_unknown = _disabled - _KNOWN_TOOLS
-for name in sorted(_unknown):
-    print(
-        f"kicad-edit-mcp: WARNING unknown tool '{name}' in DISABLED_TOOLS (ignored)",
-        file=sys.stderr,
-    )
+def _parse_disabled_tools(value: Optional[str], known: set[str]) -> dict[str, bool]:
+    """Map each known tool to its enabled state given a DISABLED_TOOLS value.
+
+    Unknown names are reported on stderr and otherwise ignored.
+    """
+    disabled = {t.strip() for t in (value or "").split(",") if t.strip()}
+    for name in sorted(disabled - known):
+        print(
+            f"kicad-edit-mcp: WARNING unknown tool '{name}' "
+            "in DISABLED_TOOLS (ignored)",
+            file=sys.stderr,
+        )
+    return {name: name not in disabled for name in known}
+
 
-_enabled = {name: name not in _disabled for name in _KNOWN_TOOLS}
+_enabled = _parse_disabled_tools(os.environ.get("DISABLED_TOOLS"), _KNOWN_TOOLS)
 
 # ---------------------------------------------------------------------------
 # Startup logging
@@ -63,6 +70,17 @@ def _err(exc: Exception) -> str:
     return f"Error: {exc}"
 
 
+def _helpers():
+    """Import kicad_helpers on first tool call.
+
+    Keeps sexpdata and the surgery engine out of server startup, so the MCP
+    handshake is not delayed by modules that only tool calls need.
+    """
+    import kicad_helpers
+
+    return kicad_helpers
+
+
 # ---------------------------------------------------------------------------
 # Tool registration (conditional)
 # ---------------------------------------------------------------------------
@@ -70,15 +88,18 @@ def _err(exc: Exception) -> str:
 if _enabled["list_components"]:
 
     @mcp.tool()
-    def list_components(schematic_path: str, filter: Optional[str] = None) -> list:
+    def list_components(
+        schematic_path: str, filter: Optional[str | list[str]] = None
+    ) -> list:
         """List all schematic components with reference, value, and footprint.
 
         Args:
             schematic_path: Path to a .kicad_sch file.
-            filter: Optional reference prefix to filter by (e.g. 'C' for capacitors).
+            filter: Optional reference prefix to filter by (e.g. 'C' for capacitors),
+                or a list of prefixes, e.g. ['C', 'R', 'L'].
         """
         try:
-            return kicad_helpers.list_components(schematic_path, filter)
+            return _helpers().list_components(schematic_path, filter)
         except ValueError as exc:
             return [_err(exc)]
 
@@ -97,7 +118,7 @@ if _enabled["get_component"]:
             reference: Exact reference designator, e.g. 'C5'.
         """
         try:
-            return kicad_helpers.get_component(schematic_path, reference)
+            return _helpers().get_component(schematic_path, reference)
         except ValueError as exc:
             return {"error": str(exc)}
 
@@ -120,7 +141,33 @@ if _enabled["update_component"]:
             properties: Mapping of property name to new value (or None to remove).
         """
         try:
-            return kicad_helpers.update_component(schematic_path, reference, properties)
+            return _helpers().update_component(schematic_path, reference, properties)
+        except ValueError as exc:
+            return _err(exc)
+
+
+if _enabled["bulk_update_components"]:
+
+    @mcp.tool()
+    def bulk_update_components(
+        schematic_path: str, updates: list[dict[str, Any]]
+    ) -> str:
+        """Set or remove properties on several components with a single save.
+
+        Each entry selects components by exact 'reference' or by
+        'reference_prefix' and carries a 'properties' dict with the same
+        semantics as update_component. Entries for the same component are
+        merged (later entries win). Nothing is written unless every entry
+        applies cleanly.
+
+        Args:
+            schematic_path: Path to a .kicad_sch file.
+            updates: List of entries, e.g.
+                [{"reference": "C5", "properties": {"Value": "100nF"}},
+                 {"reference_prefix": "R", "properties": {"Tolerance": "1%"}}].
+        """
+        try:
+            return _helpers().bulk_update_components(schematic_path, updates)
         except ValueError as exc:
             return _err(exc)
 
@@ -149,7 +196,7 @@ if _enabled["update_schematic_info"]:
             company: Company name.
         """
         try:
-            return kicad_helpers.update_schematic_info(
+            return _helpers().update_schematic_info(
                 schematic_path, title, revision, date, author, company
             )
         except ValueError as exc:
@@ -170,7 +217,47 @@ if _enabled["rename_net"]:
             new_name: Replacement text.
         """
         try:
-            return kicad_helpers.rename_net(schematic_path, old_name, new_name)
+            return _helpers().rename_net(schematic_path, old_name, new_name)
+        except ValueError as exc:
+            return _err(exc)
+
+
+if _enabled["bulk_rename_nets"]:
+
+    @mcp.tool()
+    def bulk_rename_nets(schematic_path: str, renames: dict[str, str]) -> str:
+        """Rename several nets in a schematic with a single save.
+
+        Searches local, hierarchical, and global labels. Renames apply to the
+        original label text, so {"A": "B", "B": "A"} swaps the two nets.
+
+        Args:
+            schematic_path: Path to a .kicad_sch file.
+            renames: Mapping of exact old label text to replacement text.
+        """
+        try:
+            return _helpers().bulk_rename_nets(schematic_path, renames)
+        except ValueError as exc:
+            return _err(exc)
+
+
+if _enabled["rename_net_project"]:
+
+    @mcp.tool()
+    def rename_net_project(project_path: str, old_name: str, new_name: str) -> str:
+        """Rename net labels from old_name to new_name in every sheet of a project.
+
+        Searches local, hierarchical, and global labels in the root schematic and
+        every sub-sheet it references. Nothing is written unless every sheet parses;
+        if a write fails midway, the error lists which sheets were already saved.
+
+        Args:
+            project_path: Project directory or a .kicad_pro file inside it.
+            old_name: Exact net label text to find.
+            new_name: Replacement text.
+        """
+        try:
+            return _helpers().rename_net_project(project_path, old_name, new_name)
         except ValueError as exc:
             return _err(exc)
 
@@ -185,7 +272,7 @@ if _enabled["list_net_classes"]:
             project_path: Path to a .kicad_pro file.
         """
         try:
-            return kicad_helpers.list_net_classes(project_path)
+            return _helpers().list_net_classes(project_path)
         except ValueError as exc:
             return [_err(exc)]
 
@@ -197,7 +284,7 @@ if _enabled["update_net_class"]:
         project_path: str,
         class_name: str,
         rules: Optional[dict[str, Any]] = None,
-        add_pattern: Optional[str] = None,
+        add_pattern: Optional[str | list[str]] = None,
     ) -> str:
         """Create or update a net class in a KiCad project file.
 
@@ -208,10 +295,10 @@ if _enabled["update_net_class"]:
             project_path: Path to a .kicad_pro file.
             class_name: Net class name, e.g. 'Default' or 'USB'.
             rules: Dict of rule overrides e.g. {'track_width': 0.5, 'clearance': 0.2}.
-            add_pattern: Wildcard net pattern to add, e.g. 'USB_D?'.
+            add_pattern: Wildcard net pattern to add, e.g. 'USB_D?', or a list of patterns.
         """
         try:
-            return kicad_helpers.update_net_class(
+            return _helpers().update_net_class(
                 project_path, class_name, rules, add_pattern
             )
         except ValueError as exc:
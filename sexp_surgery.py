@@ -5,7 +5,11 @@ replace individual nodes without re-serializing the entire file.
 """
 from __future__ import annotations
 
+import os
+import re
+import stat
 from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
@@ -21,6 +25,8 @@ class SexpSpan:
     node: list          # parsed sexpdata list
     depth: int          # nesting depth (0 = top-level children of kicad_sch)
     parent_index: int   # index within parent's children (for ordering)
+    # Memoized is_property_hidden() result; spans are shared by cached docs.
+    hidden: bool | None = field(default=None, compare=False, repr=False)
 
 
 class SexpDocument:
@@ -31,28 +37,43 @@ class SexpDocument:
         self.tree = tree
         self.spans = spans
         self._replacements: list[tuple[int, int, str]] = []
+        # Lazily built lookups derived from the parse; shared with fork()s.
+        self._memo: dict[str, Any] = {}
 
     @classmethod
     def load(cls, path: Path) -> "SexpDocument":
         """Parse file, build span index."""
         text = path.read_text(encoding="utf-8")
-        tree = sexpdata.loads(text)
-        spans = _build_span_index(text, tree)
+        tree, spans = _parse(text)
         return cls(text, tree, spans)
 
+    def fork(self) -> "SexpDocument":
+        """Return a document sharing this parse but with its own edit queue."""
+        doc = SexpDocument(self.text, self.tree, self.spans)
+        doc._memo = self._memo
+        return doc
+
     # ------------------------------------------------------------------
     # Query API
     # ------------------------------------------------------------------
 
     def find_all(self, node_type: str) -> list[SexpSpan]:
         """Find all top-level children of given type (depth=0 in our indexing)."""
-        results: list[SexpSpan] = []
-        for node in self.tree[1:]:
-            if isinstance(node, list) and node and str(node[0]) == node_type:
-                span = self.spans.get(id(node))
-                if span is not None:
-                    results.append(span)
-        return results
+        return list(self._type_index().get(node_type, ()))
+
+    def _type_index(self) -> dict[str, list[SexpSpan]]:
+        """Map node type → top-level spans in file order, built once per parse."""
+        index = self._memo.get("types")
+        if index is None:
+            index = {}
+            spans = self.spans
+            for node in islice(self.tree, 1, None):
+                if isinstance(node, list) and node:
+                    span = spans.get(id(node))
+                    if span is not None:
+                        index.setdefault(str(node[0]), []).append(span)
+            self._memo["types"] = index
+        return index
 
     def find_symbol(self, reference: str) -> SexpSpan | None:
         """Find a schematic symbol by its Reference property value."""
@@ -65,46 +86,92 @@ class SexpDocument:
         Multi-unit symbols (e.g. dual opamps) appear as multiple (symbol ...)
         nodes sharing the same Reference designator.  Returns all of them.
         """
-        results: list[SexpSpan] = []
-        for sym_span in self.find_all("symbol"):
-            node = sym_span.node
-            if not _has_child_key(node, "lib_id"):
-                continue
-            ref_span = self.get_property(sym_span, "Reference")
-            if ref_span is None:
-                continue
-            val = _property_value(ref_span.node)
-            if val == reference:
-                results.append(sym_span)
-        return results
+        return list(self._symbol_index().get(reference, ()))
+
+    def placed_symbols(self) -> list[SexpSpan]:
+        """Return placed symbol instances (those with a lib_id) in file order.
+
+        Built once per parse and shared with fork()s; do not mutate.
+        """
+        placed = self._memo.get("placed")
+        if placed is None:
+            placed = [
+                sym_span
+                for sym_span in self._type_index().get("symbol", ())
+                if _has_child_key(sym_span.node, "lib_id")
+            ]
+            self._memo["placed"] = placed
+        return placed
+
+    def _symbol_index(self) -> dict[str, list[SexpSpan]]:
+        """Map Reference value → placed symbol spans, built once per parse."""
+        index = self._memo.get("symbols")
+        if index is None:
+            index = {}
+            for sym_span in self.placed_symbols():
+                ref_span = self.get_property(sym_span, "Reference")
+                if ref_span is None:
+                    continue
+                index.setdefault(_property_value(ref_span.node), []).append(sym_span)
+            self._memo["symbols"] = index
+        return index
 
     def find_labels(
         self, label_type: str, text: str | None = None
     ) -> list[SexpSpan]:
         """Find label nodes, optionally filtered by text value."""
+        if text is not None:
+            return list(self._labels_by_text(label_type).get(text, ()))
         results: list[SexpSpan] = []
-        for span in self.find_all(label_type):
-            node = span.node
-            if len(node) >= 2:
-                label_text = _unwrap_string(node[1])
-                if text is None or label_text == text:
-                    results.append(span)
+        for span in self._type_index().get(label_type, ()):
+            if len(span.node) >= 2:
+                results.append(span)
         return results
 
+    def _labels_by_text(self, label_type: str) -> dict[str, list[SexpSpan]]:
+        """Map label text → spans for one label type, built once per parse."""
+        by_type = self._memo.setdefault("labels", {})
+        by_text = by_type.get(label_type)
+        if by_text is None:
+            by_text = {}
+            for span in self._type_index().get(label_type, ()):
+                node = span.node
+                if len(node) >= 2:
+                    by_text.setdefault(_unwrap_string(node[1]), []).append(span)
+            by_type[label_type] = by_text
+        return by_text
+
     def find_title_block(self) -> SexpSpan | None:
         """Find the title_block node."""
-        spans = self.find_all("title_block")
+        spans = self._type_index().get("title_block")
         return spans[0] if spans else None
 
     def get_property(self, symbol_span: SexpSpan, prop_name: str) -> SexpSpan | None:
         """Find a property node within a symbol by name."""
-        node = symbol_span.node
-        for i, child in enumerate(node[1:], start=1):
-            if not (isinstance(child, list) and child and str(child[0]) == "property"):
-                continue
-            if len(child) >= 2 and _unwrap_string(child[1]) == prop_name:
-                return self.spans.get(id(child))
-        return None
+        return self.property_spans(symbol_span).get(prop_name)
+
+    def property_spans(self, symbol_span: SexpSpan) -> dict[str, SexpSpan]:
+        """Map property name → span for a symbol (first occurrence wins).
+
+        Built once per symbol and shared with fork()s, so callers must copy
+        the dict before mutating it.
+        """
+        by_node = self._memo.setdefault("properties", {})
+        props = by_node.get(id(symbol_span.node))
+        if props is None:
+            props = {}
+            spans = self.spans
+            for child in islice(symbol_span.node, 1, None):
+                if (
+                    isinstance(child, list)
+                    and len(child) >= 2
+                    and str(child[0]) == "property"
+                ):
+                    child_span = spans.get(id(child))
+                    if child_span is not None:
+                        props.setdefault(_unwrap_string(child[1]), child_span)
+            by_node[id(symbol_span.node)] = props
+        return props
 
     def get_property_value_span(
         self, prop_span: SexpSpan
@@ -122,62 +189,34 @@ class SexpDocument:
         value = node[2]
         raw_value = _unwrap_string(value)
 
-        # Scan the property text to find the second quoted string
-        text = self.text
-        pos = prop_span.start
-        end = prop_span.end
-        quote_count = 0
-
-        i = pos
-        while i < end:
-            ch = text[i]
-            if ch == '"':
-                # Start of a quoted string
-                quote_start = i
-                i += 1
-                while i < end:
-                    if text[i] == '\\':
-                        i += 2  # skip escape
-                        continue
-                    if text[i] == '"':
-                        i += 1
-                        break
-                    i += 1
-                quote_count += 1
-                if quote_count == 2:
-                    # This is the value string
-                    return (quote_start, i, raw_value)
-            else:
-                i += 1
-        return None
+        # The value is the second quoted string in the property text
+        first = _STRING_RE.search(self.text, prop_span.start, prop_span.end)
+        if first is None:
+            return None
+        second = _STRING_RE.search(self.text, first.end(), prop_span.end)
+        if second is None:
+            return None
+        return (second.start(), second.end(), raw_value)
 
     def is_property_hidden(self, prop_span: SexpSpan) -> bool:
         """Check if a property has a hide flag.
 
         Handles both KiCad 6 bare `hide` symbol and KiCad 9 `(hide yes)` format.
+        The result is memoized on the span.
         """
-        node = prop_span.node
-        # Look in effects sub-node
-        for child in node[1:]:
-            if not (isinstance(child, list) and child and str(child[0]) == "effects"):
-                continue
-            # Check direct children of effects
-            for eff_child in child[1:]:
-                if isinstance(eff_child, sexpdata.Symbol) and str(eff_child) == "hide":
-                    return True
-                if (
-                    isinstance(eff_child, list)
-                    and eff_child
-                    and str(eff_child[0]) == "hide"
-                ):
-                    if len(eff_child) >= 2 and str(eff_child[1]) == "yes":
-                        return True
-        return False
+        if prop_span.hidden is None:
+            prop_span.hidden = _effects_hidden(prop_span.node)
+        return prop_span.hidden
 
     # ------------------------------------------------------------------
     # Mutation API
     # ------------------------------------------------------------------
 
+    @property
+    def has_edits(self) -> bool:
+        """True if any replacement is queued for the next save()."""
+        return bool(self._replacements)
+
     def replace_span(self, span: SexpSpan, new_text: str) -> None:
         """Queue replacement of the byte range [span.start, span.end)."""
         self._replacements.append((span.start, span.end, new_text))
@@ -198,17 +237,76 @@ class SexpDocument:
             start -= 1
         self._replacements.append((start, span.end, ""))
 
+    def render(self) -> str:
+        """Return the text with all queued replacements applied.
+
+        Edits are stitched together in one ascending pass and joined once,
+        so N edits cost O(len(text) + N log N) rather than one full string
+        copy per edit.  Insertions at the same offset keep the historical
+        back-to-front order (last queued ends up first).
+
+        Raises:
+            ValueError: If two queued edits overlap.
+        """
+        if not self._replacements:
+            return self.text
+        text = self.text
+        ordered = sorted(
+            enumerate(self._replacements),
+            key=lambda item: (item[1][0], item[1][1], -item[0]),
+        )
+        parts: list[str] = []
+        pos = 0
+        for _, (start, end, new_text) in ordered:
+            if start < pos:
+                raise ValueError(
+                    f"Overlapping edits at byte {start} (previous edit ends at {pos})"
+                )
+            parts.append(text[pos:start])
+            parts.append(new_text)
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
+
     def save(self, path: Path) -> None:
-        """Apply all queued replacements back-to-front and write to disk."""
-        result = self.text
-        for start, end, new_text in sorted(
-            self._replacements, key=lambda r: r[0], reverse=True
-        ):
-            result = result[:start] + new_text + result[end:]
-        path.write_text(result, encoding="utf-8")
+        """Apply all queued replacements and write to disk.
+
+        The file is replaced atomically, so a failed save never leaves a
+        truncated schematic behind.
+        """
+        atomic_write_bytes(path, self.render().encode("utf-8"))
         self._replacements.clear()
 
 
+# ---------------------------------------------------------------------------
+# File output
+# ---------------------------------------------------------------------------
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` via a temp file and ``os.replace``.
+
+    A crash mid-write leaves either the old or the new file on disk, never a
+    truncated one.  The original file mode is preserved, and symlinks are
+    followed so the link itself is not replaced.
+    """
+    target = path.resolve()
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        try:
+            os.chmod(tmp, stat.S_IMODE(target.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
@@ -216,10 +314,9 @@ class SexpDocument:
 
 def _unwrap_string(value: Any) -> str:
     """Extract a plain Python string from a sexpdata value."""
+    # sexpdata.Symbol subclasses str, so it needs no conversion either.
     if isinstance(value, str):
         return value
-    if isinstance(value, sexpdata.Symbol):
-        return str(value)
     return str(value)
 
 
@@ -230,9 +327,31 @@ def _property_value(prop_node: list) -> str:
     return ""
 
 
+def _effects_hidden(prop_node: list) -> bool:
+    """Return True if a property node's effects carry a hide flag."""
+    # Heads are compared via str(): sexpdata's Symbol.__eq__ is a Python-level
+    # method and costs more than the C-level copy.
+    for child in islice(prop_node, 1, None):
+        if not (isinstance(child, list) and child and str(child[0]) == "effects"):
+            continue
+        # A property has a single effects node; its children decide.
+        for eff_child in islice(child, 1, None):
+            if isinstance(eff_child, list):
+                if (
+                    len(eff_child) >= 2
+                    and str(eff_child[0]) == "hide"
+                    and str(eff_child[1]) == "yes"
+                ):
+                    return True
+            elif isinstance(eff_child, sexpdata.Symbol) and str(eff_child) == "hide":
+                return True
+        return False
+    return False
+
+
 def _has_child_key(node: list, key: str) -> bool:
     """Return True if node has a child list starting with Symbol(key)."""
-    for child in node[1:]:
+    for child in islice(node, 1, None):
         if isinstance(child, list) and child and str(child[0]) == key:
             return True
     return False
@@ -242,9 +361,18 @@ def _has_child_key(node: list, key: str) -> bool:
 # Byte-span tracking
 # ---------------------------------------------------------------------------
 
+# A quoted string with backslash escapes (unrolled-loop form).  The closing
+# quote is optional and captured, so an unterminated string swallows the rest
+# of the range — matching how KiCad's own tokenizer treats it — and leaves
+# group 1 unset.  Shared with kicad_helpers.
+_STRING_BODY = r'"[^"\\]*(?:\\.[^"\\]*)*'
+_STRING_RE = re.compile(_STRING_BODY + '(")?', re.DOTALL)
+# The same, or a paren.
+_TOKEN_RE = re.compile(_STRING_RE.pattern + r"|[()]", re.DOTALL)
+
 
 def _build_span_index(text: str, tree: list) -> dict[int, SexpSpan]:
-    """Scan text character-by-character to find s-expression spans, then
+    """Scan text token-by-token to find s-expression spans, then
     correlate with sexpdata-parsed tree nodes by order.
 
     Returns a dict mapping id(node) → SexpSpan for:
@@ -261,34 +389,17 @@ def _build_span_index(text: str, tree: list) -> dict[int, SexpSpan]:
     # map from depth1 span start → list of (start, end) for its depth-2 children
 
     current_depth = 0
-    in_string = False
-    i = 0
-    n = len(text)
-
-    # Stack entries: (start_pos, depth_at_open, depth1_start_if_applicable)
-    open_stack: list[tuple[int, int, int]] = []  # (start, current_depth_before_open, depth1_parent_start)
-
-    while i < n:
-        ch = text[i]
-
-        if in_string:
-            if ch == "\\":
-                i += 2
-                continue
-            if ch == '"':
-                in_string = False
-            i += 1
-            continue
 
-        if ch == '"':
-            in_string = True
-            i += 1
-            continue
+    # Stack entries: (start_pos, depth_at_open, depth1_parent_start)
+    open_stack: list[tuple[int, int, int]] = []
 
-        if ch == "(":
-            # Push onto stack: record position and depth BEFORE incrementing
-            depth1_parent = open_stack[-1][2] if open_stack else -1
-            # For scanner depth 2 children, we want to know the depth-1 ancestor
+    # The regex skips whole string literals and runs of plain text in C, so
+    # the Python loop only runs once per paren rather than once per character.
+    for m in _TOKEN_RE.finditer(text):
+        tok = m.group()
+
+        if tok == "(":
+            i = m.start()
             if current_depth == 1:
                 # This open paren starts a depth-1 node
                 open_stack.append((i, current_depth, i))
@@ -299,24 +410,16 @@ def _build_span_index(text: str, tree: list) -> dict[int, SexpSpan]:
             else:
                 open_stack.append((i, current_depth, -1))
             current_depth += 1
-            i += 1
-            continue
 
-        if ch == ")":
+        elif tok == ")":
             current_depth -= 1
             if open_stack:
                 start, depth_at_open, d1_parent = open_stack.pop()
-                end = i + 1
+                end = m.end()
                 if depth_at_open == 1:
                     depth1_spans.append((start, end))
                 elif depth_at_open == 2:
-                    if d1_parent not in depth2_by_parent:
-                        depth2_by_parent[d1_parent] = []
-                    depth2_by_parent[d1_parent].append((start, end))
-            i += 1
-            continue
-
-        i += 1
+                    depth2_by_parent.setdefault(d1_parent, []).append((start, end))
 
     # Step 2: correlate depth-1 spans with tree[1:] by order
     spans: dict[int, SexpSpan] = {}
@@ -344,10 +447,9 @@ def _build_span_index(text: str, tree: list) -> dict[int, SexpSpan]:
             continue
 
         child_spans = depth2_by_parent.get(start, [])
-        tree_node_children = tree_node[1:]  # skip the node type Symbol
-
-        # Filter to list-type children only (atoms don't have spans)
-        list_children = [c for c in tree_node_children if isinstance(c, list)]
+        # Filter to list-type children only (atoms don't have spans),
+        # skipping the node type Symbol
+        list_children = [c for c in islice(tree_node, 1, None) if isinstance(c, list)]
 
         for cidx, (child_node, (cstart, cend)) in enumerate(
             zip(list_children, child_spans)
@@ -362,3 +464,109 @@ def _build_span_index(text: str, tree: list) -> dict[int, SexpSpan]:
             spans[id(child_node)] = csp
 
     return spans
+
+
+# One token per match: a quoted string, a paren, or a plain atom.  Anything
+# else (sexpdata's quote, comment and bracket syntax, escapes outside strings,
+# an unterminated string) lands in the last group and sends the parse back to
+# sexpdata.  Whitespace is sexpdata's (string.whitespace), not regex \s.
+_PARSE_RE = re.compile(
+    r"[ \t\n\r\x0b\x0c]*(?:(" + _STRING_BODY + r'")|(\()|(\))'
+    r"|([^ \t\n\r\x0b\x0c()\"\[\];\\']+)|([^ \t\n\r\x0b\x0c]))",
+    re.DOTALL,
+)
+_ESCAPE_RE = re.compile(r"\\.", re.DOTALL)
+_STRING_ESCAPES = {
+    "\\\\": "\\", '\\"': '"', "\\b": "\b", "\\f": "\f",
+    "\\n": "\n", "\\r": "\r", "\\t": "\t",
+}
+
+
+class _Unsupported(Exception):
+    """Input needs sexpdata's full parser."""
+
+
+def _unescape(match: re.Match) -> str:
+    seq = match.group()
+    return _STRING_ESCAPES.get(seq, seq)
+
+
+def _atom(token: str) -> Any:
+    """Convert a bare token exactly as sexpdata's Parser.atom() does."""
+    if token == "nil":
+        # sexpdata turns it into [], a list with no parens behind it
+        raise _Unsupported
+    if token == "t":
+        return True
+    try:
+        return int(token)
+    except ValueError:
+        try:
+            return float(token)
+        except ValueError:
+            return sexpdata.Symbol(token)
+
+
+def _parse(text: str) -> tuple[list, dict[int, SexpSpan]]:
+    """Parse text into a sexpdata-compatible tree and its span index.
+
+    Builds both in a single tokenizing pass.  Input outside the subset KiCad
+    writes falls back to ``sexpdata.loads`` plus ``_build_span_index``, so
+    results and errors match sexpdata in every case.
+    """
+    try:
+        return _parse_fast(text)
+    except _Unsupported:
+        tree = sexpdata.loads(text)
+        return tree, _build_span_index(text, tree)
+
+
+def _parse_fast(text: str) -> tuple[list, dict[int, SexpSpan]]:
+    toplevel: list = []
+    cur = toplevel
+    # Per open list: (parent list, start offset, index among list siblings)
+    stack: list[tuple[list, int, int]] = []
+    # Lists seen so far among the children of each open list
+    counts = [0]
+    spans: dict[int, SexpSpan] = {}
+    atoms: dict[str, Any] = {}
+
+    for m in _PARSE_RE.finditer(text):
+        kind = m.lastindex
+        if kind == 4:
+            tok = m.group(4)
+            try:
+                cur.append(atoms[tok])
+            except KeyError:
+                atoms[tok] = value = _atom(tok)
+                cur.append(value)
+        elif kind == 1:
+            s = text[m.start(1) + 1:m.end(1) - 1]
+            if "\\" in s:
+                s = _ESCAPE_RE.sub(_unescape, s)
+            cur.append(s)
+        elif kind == 2:
+            node: list = []
+            cur.append(node)
+            stack.append((cur, m.start(2), counts[-1]))
+            counts[-1] += 1
+            counts.append(0)
+            cur = node
+        elif kind == 3:
+            if not stack:
+                raise _Unsupported
+            node = cur
+            cur, start, idx = stack.pop()
+            counts.pop()
+            depth = len(stack) - 1
+            if depth == 0 or depth == 1:
+                spans[id(node)] = SexpSpan(
+                    start=start, end=m.end(3), node=node,
+                    depth=depth, parent_index=idx,
+                )
+        else:
+            raise _Unsupported
+
+    if stack or len(toplevel) != 1 or not isinstance(toplevel[0], list):
+        raise _Unsupported
+    return toplevel[0], spans
@@ -0,0 +1,14 @@
+"""Shared pytest fixtures."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(scope="session")
+def fixture_bytes() -> dict[Path, bytes]:
+    """Contents of every file in tests/fixtures keyed by path, read once."""
+    return {src: src.read_bytes() for src in FIXTURES.iterdir() if src.is_file()}
@@ -2,51 +2,87 @@
 
 from __future__ import annotations
 
-import shutil
+import json
+import os
+import re
+from collections import OrderedDict
 from pathlib import Path
 
 import pytest
 
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
 import kicad_helpers
+import sexp_surgery
+from sexp_surgery import SexpDocument
 
 FIXTURES = Path(__file__).parent / "fixtures"
 SCH_FIXTURE = FIXTURES / "test_schematic.kicad_sch"
 SCH_V9_FIXTURE = FIXTURES / "test_schematic_v9.kicad_sch"
 SCH_MULTI_FIXTURE = FIXTURES / "test_multiunit.kicad_sch"
+IO_FIXTURE = FIXTURES / "IO.kicad_sch"
 PRO_FIXTURE = FIXTURES / "test_project.kicad_pro"
 
+# Fields KiCad 9 requires on every net class
+NET_CLASS_FIELDS = frozenset({
+    "bus_width", "clearance", "diff_pair_gap", "diff_pair_via_gap",
+    "diff_pair_width", "line_style", "microvia_diameter", "microvia_drill",
+    "pcb_color", "priority", "schematic_color", "track_width",
+    "via_diameter", "via_drill", "wire_width",
+})
+
+
+@pytest.fixture(scope="session")
+def sch_ro(
+    tmp_path_factory: pytest.TempPathFactory, fixture_bytes: dict[Path, bytes]
+) -> Path:
+    """Session-wide copy of the schematic fixture for tests that never write.
+
+    Shared by the whole session, so kicad_helpers' parse cache serves every
+    read-only test after the first from a single parse.
+    """
+    dest = tmp_path_factory.mktemp("ro") / "test.kicad_sch"
+    dest.write_bytes(fixture_bytes[SCH_FIXTURE])
+    return dest
+
+
+@pytest.fixture(scope="session")
+def pro_ro(
+    tmp_path_factory: pytest.TempPathFactory, fixture_bytes: dict[Path, bytes]
+) -> Path:
+    """Session-wide copy of the project fixture for tests that never write."""
+    dest = tmp_path_factory.mktemp("ro") / "test.kicad_pro"
+    dest.write_bytes(fixture_bytes[PRO_FIXTURE])
+    return dest
+
 
 @pytest.fixture()
-def sch(tmp_path: Path) -> Path:
-    """Copy schematic fixture to tmp_path for safe mutation."""
+def sch(tmp_path: Path, fixture_bytes: dict[Path, bytes]) -> Path:
+    """Write a fresh schematic fixture into tmp_path for safe mutation."""
     dest = tmp_path / "test.kicad_sch"
-    shutil.copy(SCH_FIXTURE, dest)
+    dest.write_bytes(fixture_bytes[SCH_FIXTURE])
     return dest
 
 
 @pytest.fixture()
-def sch_v9(tmp_path: Path) -> Path:
-    """Copy KiCad 9 schematic fixture to tmp_path for safe mutation."""
+def sch_v9(tmp_path: Path, fixture_bytes: dict[Path, bytes]) -> Path:
+    """Write a fresh KiCad 9 schematic fixture into tmp_path for safe mutation."""
     dest = tmp_path / "test_v9.kicad_sch"
-    shutil.copy(SCH_V9_FIXTURE, dest)
+    dest.write_bytes(fixture_bytes[SCH_V9_FIXTURE])
     return dest
 
 
 @pytest.fixture()
-def sch_multi(tmp_path: Path) -> Path:
-    """Copy multi-unit schematic fixture to tmp_path for safe mutation."""
+def sch_multi(tmp_path: Path, fixture_bytes: dict[Path, bytes]) -> Path:
+    """Write a fresh multi-unit schematic fixture into tmp_path for safe mutation."""
     dest = tmp_path / "test_multi.kicad_sch"
-    shutil.copy(SCH_MULTI_FIXTURE, dest)
+    dest.write_bytes(fixture_bytes[SCH_MULTI_FIXTURE])
     return dest
 
 
 @pytest.fixture()
-def pro(tmp_path: Path) -> Path:
-    """Copy project fixture to tmp_path for safe mutation."""
+def pro(tmp_path: Path, fixture_bytes: dict[Path, bytes]) -> Path:
+    """Write a fresh project fixture into tmp_path for safe mutation."""
     dest = tmp_path / "test.kicad_pro"
-    shutil.copy(PRO_FIXTURE, dest)
+    dest.write_bytes(fixture_bytes[PRO_FIXTURE])
     return dest
 
 
@@ -55,26 +91,40 @@ def pro(tmp_path: Path) -> Path:
 # ---------------------------------------------------------------------------
 
 
-def test_list_components_returns_all(sch: Path) -> None:
-    comps = kicad_helpers.list_components(str(sch))
-    refs = [c["reference"] for c in comps]
-    assert "R1" in refs
-    assert "C1" in refs
-    assert "U1" in refs
+def test_list_components_returns_all(sch_ro: Path) -> None:
+    comps = kicad_helpers.list_components(str(sch_ro))
+    refs = {c["reference"] for c in comps}
+    assert {"R1", "C1", "U1"} <= refs
     assert len(comps) == 3
 
 
-def test_list_components_filter_c(sch: Path) -> None:
-    comps = kicad_helpers.list_components(str(sch), filter="C")
+def test_list_components_filter_c(sch_ro: Path) -> None:
+    comps = kicad_helpers.list_components(str(sch_ro), filter="C")
     assert len(comps) == 1
     assert comps[0]["reference"] == "C1"
 
 
-def test_list_components_filter_no_match(sch: Path) -> None:
-    comps = kicad_helpers.list_components(str(sch), filter="X")
+def test_list_components_filter_multiple_prefixes(sch_ro: Path) -> None:
+    comps = kicad_helpers.list_components(str(sch_ro), filter=["C", "R"])
+    assert [c["reference"] for c in comps] == ["R1", "C1"]
+
+
+def test_list_components_filter_no_match(sch_ro: Path) -> None:
+    comps = kicad_helpers.list_components(str(sch_ro), filter="X")
     assert comps == []
 
 
+def test_iter_components_is_lazy(sch_ro: Path) -> None:
+    it = kicad_helpers.iter_components(str(sch_ro), filter="C")
+    assert next(it)["reference"] == "C1"
+    assert next(it, None) is None
+
+
+def test_iter_components_missing_file_raises_eagerly() -> None:
+    with pytest.raises(ValueError, match="not found"):
+        kicad_helpers.iter_components("/nonexistent/path.kicad_sch")
+
+
 def test_list_components_missing_file() -> None:
     with pytest.raises(ValueError, match="not found"):
         kicad_helpers.list_components("/nonexistent/path.kicad_sch")
@@ -85,21 +135,105 @@ def test_list_components_missing_file() -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_get_component_r1(sch: Path) -> None:
-    props = kicad_helpers.get_component(str(sch), "R1")
+def test_get_component_r1(sch_ro: Path) -> None:
+    props = kicad_helpers.get_component(str(sch_ro), "R1")
     assert props["Reference"]["value"] == "R1"
     assert props["Value"]["value"] == "10k"
     assert "Footprint" in props
 
 
-def test_get_component_c1(sch: Path) -> None:
-    props = kicad_helpers.get_component(str(sch), "C1")
+def test_get_component_c1(sch_ro: Path) -> None:
+    props = kicad_helpers.get_component(str(sch_ro), "C1")
     assert props["Value"]["value"] == "100nF"
 
 
-def test_get_component_missing_raises(sch: Path) -> None:
+def test_get_component_missing_raises(sch_ro: Path) -> None:
     with pytest.raises(ValueError, match="not found"):
-        kicad_helpers.get_component(str(sch), "MISSING")
+        kicad_helpers.get_component(str(sch_ro), "MISSING")
+
+
+# ---------------------------------------------------------------------------
+# Schematic parse cache
+# ---------------------------------------------------------------------------
+
+
+def test_load_schematic_reuses_parse(sch_ro: Path) -> None:
+    first = kicad_helpers._load_schematic(sch_ro)
+    second = kicad_helpers._load_schematic(sch_ro)
+    assert second is not first
+    assert second.tree is first.tree
+
+
+def test_load_schematic_reparses_after_save(sch: Path) -> None:
+    first = kicad_helpers._load_schematic(sch)
+    kicad_helpers.update_component(str(sch), "R1", {"Value": "4k7"})
+    second = kicad_helpers._load_schematic(sch)
+    assert second.tree is not first.tree
+    assert '"4k7"' in second.text
+
+
+def test_disk_cache_roundtrip(
+    sch: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("KICAD_MCP_CACHE", "1")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(kicad_helpers, "_schematic_cache", OrderedDict())
+    first = kicad_helpers.get_component(str(sch), "R1")
+    assert list((tmp_path / "cache" / "kicad-edit-mcp").glob("*.pkl"))
+
+    kicad_helpers._schematic_cache.clear()
+    assert kicad_helpers.get_component(str(sch), "R1") == first
+    kicad_helpers.update_component(str(sch), "R1", {"Value": "4k7"})
+    assert kicad_helpers.get_component(str(sch), "R1")["Value"]["value"] == "4k7"
+
+
+def test_disk_cache_one_entry_per_file(
+    sch: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Edits overwrite the file's entry instead of adding one per version."""
+    monkeypatch.setenv("KICAD_MCP_CACHE", "1")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(kicad_helpers, "_schematic_cache", OrderedDict())
+    for value in ("1k", "22k", "470k"):
+        kicad_helpers.update_component(str(sch), "R1", {"Value": value})
+        kicad_helpers._schematic_cache.clear()
+        assert kicad_helpers.get_component(str(sch), "R1")["Value"]["value"] == value
+    assert len(list((tmp_path / "cache" / "kicad-edit-mcp").glob("*.pkl"))) == 1
+
+
+def test_disk_cache_corrupt_entry_not_removable(
+    sch: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A corrupt pickle that cannot be deleted still falls back to parsing."""
+    monkeypatch.setenv("KICAD_MCP_CACHE", "1")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(kicad_helpers, "_schematic_cache", OrderedDict())
+    cache_file = kicad_helpers._disk_cache_file(sch)
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_bytes(b"not a pickle")
+
+    def deny_unlink(self, missing_ok=False):
+        raise PermissionError(f"read-only: {self}")
+
+    monkeypatch.setattr(Path, "unlink", deny_unlink)
+    assert kicad_helpers.get_component(str(sch), "R1")["Value"]["value"] == "10k"
+
+
+def test_disk_cache_pickling_error_not_fatal(
+    sch: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import pickle
+
+    monkeypatch.setenv("KICAD_MCP_CACHE", "1")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(kicad_helpers, "_schematic_cache", OrderedDict())
+
+    def fail_dumps(*args, **kwargs):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr(pickle, "dumps", fail_dumps)
+    assert kicad_helpers.get_component(str(sch), "R1")["Value"]["value"] == "10k"
+    assert not (tmp_path / "cache" / "kicad-edit-mcp").exists()
 
 
 # ---------------------------------------------------------------------------
@@ -139,17 +273,133 @@ def test_update_component_rejects_malformed_dict(sch: Path) -> None:
         kicad_helpers.update_component(str(sch), "R1", {"Voltage": {"foo": "bar"}})
 
 
+def test_bulk_update_components_multiple_refs(sch: Path) -> None:
+    result = kicad_helpers.bulk_update_components(
+        str(sch),
+        [
+            {"reference": "R1", "properties": {"Value": "4k7"}},
+            {"reference": "C1", "properties": {"Value": "220nF"}},
+        ],
+    )
+    assert "R1" in result and "C1" in result
+    assert kicad_helpers.get_component(str(sch), "R1")["Value"]["value"] == "4k7"
+    assert kicad_helpers.get_component(str(sch), "C1")["Value"]["value"] == "220nF"
+
+
+def test_bulk_update_components_prefix(sch: Path) -> None:
+    kicad_helpers.bulk_update_components(
+        str(sch), [{"reference_prefix": "C", "properties": {"Voltage": "50V"}}]
+    )
+    assert kicad_helpers.get_component(str(sch), "C1")["Voltage"]["value"] == "50V"
+    assert "Voltage" not in kicad_helpers.get_component(str(sch), "R1")
+
+
+def test_bulk_update_components_merges_same_ref(sch: Path) -> None:
+    kicad_helpers.bulk_update_components(
+        str(sch),
+        [
+            {"reference": "R1", "properties": {"Value": "1k"}},
+            {"reference": "R1", "properties": {"Value": "2k2", "MPN": "X"}},
+        ],
+    )
+    props = kicad_helpers.get_component(str(sch), "R1")
+    assert props["Value"]["value"] == "2k2"
+    assert props["MPN"]["value"] == "X"
+
+
+def test_bulk_update_components_missing_ref_writes_nothing(sch: Path) -> None:
+    original = sch.read_bytes()
+    with pytest.raises(ValueError, match="not found"):
+        kicad_helpers.bulk_update_components(
+            str(sch),
+            [
+                {"reference": "R1", "properties": {"Value": "4k7"}},
+                {"reference": "MISSING", "properties": {"Value": "x"}},
+            ],
+        )
+    assert sch.read_bytes() == original
+
+
+@pytest.mark.parametrize(
+    ("updates", "match"),
+    [
+        ([], "nothing to update"),
+        (["R1"], "must be a dict"),
+        ([{"reference": "R1", "properties": {"Value": "4k7"}}, None], "must be a dict"),
+    ],
+)
+def test_bulk_update_components_malformed_updates(
+    sch: Path, updates: list, match: str
+) -> None:
+    original = sch.read_bytes()
+    with pytest.raises(ValueError, match=match):
+        kicad_helpers.bulk_update_components(str(sch), updates)
+    assert sch.read_bytes() == original
+
+
+def test_update_component_same_value_skips_save(sch: Path) -> None:
+    os.utime(sch, ns=(0, 0))
+    result = kicad_helpers.update_component(str(sch), "R1", {"Value": "10k"})
+    assert "unchanged" in result
+    assert sch.stat().st_mtime_ns == 0
+
+
+def test_update_component_single_parse_and_write_for_batch(
+    sch: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A multi-property update parses the file once and writes it once."""
+    loads: list[Path] = []
+    writes: list[Path] = []
+    real_load = SexpDocument.load.__func__
+    real_write = sexp_surgery.atomic_write_bytes
+
+    def counting_load(cls, path):
+        loads.append(path)
+        return real_load(cls, path)
+
+    def counting_write(path, data):
+        writes.append(path)
+        real_write(path, data)
+
+    monkeypatch.setattr(SexpDocument, "load", classmethod(counting_load))
+    monkeypatch.setattr(sexp_surgery, "atomic_write_bytes", counting_write)
+    kicad_helpers.update_component(
+        str(sch), "R1", {"Value": "4k7", "Voltage": "3.3V", "Current": "1A"}
+    )
+    assert len(loads) == 1
+    assert len(writes) == 1
+
+
+def test_update_component_new_properties_keep_request_order(sch: Path) -> None:
+    kicad_helpers.update_component(str(sch), "R1", {"MPN": "RC0603", "Tolerance": "1%"})
+    raw = sch.read_text()
+    assert raw.index('(property "MPN"') < raw.index('(property "Tolerance"')
+
+
+def test_update_component_escapes_special_chars(sch: Path) -> None:
+    value = 'say "hi"\\n\nline2'
+    kicad_helpers.update_component(str(sch), "R1", {"Value": value})
+    assert '"say \\"hi\\"\\\\n\\nline2"' in sch.read_text()
+    assert kicad_helpers.get_component(str(sch), "R1")["Value"]["value"] == value
+
+
 # ---------------------------------------------------------------------------
 # Property visibility
 # ---------------------------------------------------------------------------
 
 
-def test_update_preserves_hidden_properties(sch: Path) -> None:
-    """Changing Value must not alter the hidden state of Footprint."""
-    kicad_helpers.update_component(str(sch), "R1", {"Value": "4k7"})
-    props = kicad_helpers.get_component(str(sch), "R1")
-    # Footprint was hidden in fixture — must remain hidden after update
+@pytest.mark.parametrize("fixture_name", ["sch", "sch_v9"])
+def test_update_preserves_hidden_properties(
+    fixture_name: str, request: pytest.FixtureRequest
+) -> None:
+    """Changing Value must not make Footprint/Datasheet visible (KiCad 6 and 9)."""
+    path = request.getfixturevalue(fixture_name)
+    kicad_helpers.update_component(str(path), "R1", {"Value": "4k7"})
+    props = kicad_helpers.get_component(str(path), "R1")
+    # Both were hidden in the fixture — must remain hidden after update
     assert props["Footprint"]["visible"] is False
+    assert props["Datasheet"]["visible"] is False
+    assert props["Value"]["value"] == "4k7"
 
 
 def test_new_property_defaults_hidden(sch: Path) -> None:
@@ -161,9 +411,9 @@ def test_new_property_defaults_hidden(sch: Path) -> None:
     assert props["Voltage"]["visible"] is False
 
 
-def test_new_reference_value_default_visible(sch: Path) -> None:
+def test_new_reference_value_default_visible(sch_ro: Path) -> None:
     """Reference/Value properties added as new are visible by convention."""
-    props = kicad_helpers.get_component(str(sch), "R1")
+    props = kicad_helpers.get_component(str(sch_ro), "R1")
     assert props["Reference"]["visible"] is True
     assert props["Value"]["visible"] is True
 
@@ -178,9 +428,16 @@ def test_explicit_visibility_override(sch: Path) -> None:
     assert props["Voltage"]["visible"] is True
 
 
-def test_get_component_returns_visibility(sch: Path) -> None:
-    """get_component returns {value, visible} dicts for every property."""
-    props = kicad_helpers.get_component(str(sch), "R1")
+@pytest.mark.parametrize("fixture_name", ["sch_ro", "sch_v9"])
+def test_get_component_returns_visibility(
+    fixture_name: str, request: pytest.FixtureRequest
+) -> None:
+    """get_component returns {value, visible} dicts for every property.
+
+    Covers both the KiCad 6 bare ``hide`` and the KiCad 9 ``(hide yes)`` form.
+    """
+    path = request.getfixturevalue(fixture_name)
+    props = kicad_helpers.get_component(str(path), "R1")
     for key, entry in props.items():
         assert isinstance(entry, dict), f"{key} should be a dict"
         assert "value" in entry, f"{key} missing 'value'"
@@ -192,6 +449,26 @@ def test_get_component_returns_visibility(sch: Path) -> None:
     assert props["Datasheet"]["visible"] is False
 
 
+@pytest.mark.parametrize("fixture_name", ["sch", "sch_v9"])
+def test_toggle_existing_property_visibility(
+    fixture_name: str, request: pytest.FixtureRequest
+) -> None:
+    path = request.getfixturevalue(fixture_name)
+    fp = kicad_helpers.get_component(str(path), "R1")["Footprint"]["value"]
+    os.utime(path, ns=(0, 0))
+    kicad_helpers.update_component(
+        str(path), "R1", {"Footprint": {"value": fp, "visible": False}}
+    )
+    assert path.stat().st_mtime_ns == 0  # already hidden: nothing written
+
+    for visible in (True, False):
+        kicad_helpers.update_component(
+            str(path), "R1", {"Footprint": {"value": fp, "visible": visible}}
+        )
+        props = kicad_helpers.get_component(str(path), "R1")
+        assert props["Footprint"]["visible"] is visible
+
+
 def test_update_component_file_changed(sch: Path) -> None:
     kicad_helpers.update_component(str(sch), "U1", {"Value": "ESP32"})
     # Read back to confirm persistence
@@ -204,39 +481,19 @@ def test_update_component_file_changed(sch: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_kicad9_get_component_visibility(sch_v9: Path) -> None:
-    """KiCad 9 fixture: (hide yes) parsed correctly as visible=False."""
-    props = kicad_helpers.get_component(str(sch_v9), "R1")
-    assert props["Reference"]["visible"] is True
-    assert props["Value"]["visible"] is True
-    assert props["Footprint"]["visible"] is False
-    assert props["Datasheet"]["visible"] is False
-
-
-def test_kicad9_update_preserves_hidden(sch_v9: Path) -> None:
-    """KiCad 9: updating Value must not make Footprint/Datasheet visible."""
-    kicad_helpers.update_component(str(sch_v9), "R1", {"Value": "4k7"})
-    props = kicad_helpers.get_component(str(sch_v9), "R1")
-    assert props["Footprint"]["visible"] is False
-    assert props["Datasheet"]["visible"] is False
-    assert props["Value"]["value"] == "4k7"
-
-
 def test_kicad9_roundtrip_format(sch_v9: Path) -> None:
     """KiCad 9: saved file must preserve (hide yes) tokens."""
     kicad_helpers.update_component(str(sch_v9), "R1", {"Value": "4k7"})
-    raw = sch_v9.read_text()
-    assert "(hide yes)" in raw
+    raw = sch_v9.read_bytes()
+    assert b"(hide yes)" in raw
 
 
 def test_kicad9_all_components_preserved(sch_v9: Path) -> None:
     """KiCad 9: all 3 components survive round-trip."""
     kicad_helpers.update_component(str(sch_v9), "C1", {"Value": "220nF"})
     comps = kicad_helpers.list_components(str(sch_v9))
-    refs = [c["reference"] for c in comps]
-    assert "R1" in refs
-    assert "C1" in refs
-    assert "U1" in refs
+    refs = {c["reference"] for c in comps}
+    assert {"R1", "C1", "U1"} <= refs
     assert len(comps) == 3
 
 
@@ -245,23 +502,24 @@ def test_kicad9_all_components_preserved(sch_v9: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_update_schematic_info_title(sch: Path) -> None:
-    result = kicad_helpers.update_schematic_info(str(sch), title="New Title")
-    assert "title" in result.lower()
-    raw = sch.read_text()
-    assert '"New Title"' in raw
+@pytest.mark.parametrize(
+    "field,value", [("title", "New Title"), ("revision", "2.1")]
+)
+def test_update_schematic_info_field(sch: Path, field: str, value: str) -> None:
+    result = kicad_helpers.update_schematic_info(str(sch), **{field: value})
+    assert field in result.lower()
+    assert f'"{value}"'.encode() in sch.read_bytes()
 
 
-def test_update_schematic_info_revision(sch: Path) -> None:
-    result = kicad_helpers.update_schematic_info(str(sch), revision="2.1")
-    assert "revision" in result.lower()
-    raw = sch.read_text()
-    assert '"2.1"' in raw
+def test_update_schematic_info_no_args(sch_ro: Path) -> None:
+    result = kicad_helpers.update_schematic_info(str(sch_ro))
+    assert "no fields" in result.lower()
 
 
-def test_update_schematic_info_no_args(sch: Path) -> None:
-    result = kicad_helpers.update_schematic_info(str(sch))
-    assert "no fields" in result.lower()
+def test_update_schematic_info_no_args_skips_save(sch: Path) -> None:
+    os.utime(sch, ns=(0, 0))
+    kicad_helpers.update_schematic_info(str(sch))
+    assert sch.stat().st_mtime_ns == 0
 
 
 # ---------------------------------------------------------------------------
@@ -277,9 +535,9 @@ def test_rename_net_success(sch: Path) -> None:
 
 def test_rename_net_verifies_in_file(sch: Path) -> None:
     kicad_helpers.rename_net(str(sch), "SPI1_SCK", "SPI_CLK")
-    raw = sch.read_text()
-    assert '"SPI_CLK"' in raw
-    assert '"SPI1_SCK"' not in raw
+    raw = sch.read_bytes()
+    assert b'"SPI_CLK"' in raw
+    assert b'"SPI1_SCK"' not in raw
 
 
 def test_rename_net_no_match(sch: Path) -> None:
@@ -287,20 +545,148 @@ def test_rename_net_no_match(sch: Path) -> None:
     assert "nothing changed" in result.lower() or "0" in result
 
 
+def test_rename_net_same_name_noop(sch: Path) -> None:
+    os.utime(sch, ns=(0, 0))
+    result = kicad_helpers.rename_net(str(sch), "SPI1_SCK", "SPI1_SCK")
+    assert "nothing changed" in result.lower()
+    assert sch.stat().st_mtime_ns == 0
+
+
+def test_bulk_rename_nets(sch: Path) -> None:
+    result = kicad_helpers.bulk_rename_nets(
+        str(sch), {"SPI1_SCK": "SPI_CLK", "NONEXISTENT": "NEW"}
+    )
+    assert "Renamed 1 label(s) from 'SPI1_SCK'" in result
+    assert "No labels named 'NONEXISTENT'" in result
+    raw = sch.read_text()
+    assert '"SPI_CLK"' in raw
+    assert '"SPI1_SCK"' not in raw
+
+
+def test_bulk_rename_nets_swap(
+    tmp_path: Path, fixture_bytes: dict[Path, bytes]
+) -> None:
+    """Renames apply to the original text, so a two-way mapping swaps nets."""
+    dest = tmp_path / "IO.kicad_sch"
+    dest.write_bytes(fixture_bytes[IO_FIXTURE])
+    before = SexpDocument.load(dest)
+    miso = [s.start for s in before.find_labels("hierarchical_label", "MISO")]
+    kicad_helpers.bulk_rename_nets(str(dest), {"MISO": "MOSI", "MOSI": "MISO"})
+    after = SexpDocument.load(dest)
+    assert [s.start for s in after.find_labels("hierarchical_label", "MOSI")] == miso
+
+
+def _add_sheet(parent: Path, sheetfile: str, prop: str = "Sheetfile") -> None:
+    """Append a (sheet ...) node referencing ``sheetfile`` to ``parent``."""
+    text = parent.read_text().rstrip()
+    node = (
+        f'  (sheet (at 0 0) (size 10 10)\n'
+        f'    (property "Sheetname" "{Path(sheetfile).stem}" (at 0 0 0))\n'
+        f'    (property "{prop}" "{sheetfile}" (at 0 0 0)))\n'
+    )
+    parent.write_text(text[:-1] + node + ")\n")
+
+
+@pytest.fixture()
+def project_tree(sch: Path, pro: Path, fixture_bytes: dict[Path, bytes]) -> Path:
+    """Root sheet -> sub/sheet2 -> sub/io (KiCad 6 spelling), plus a stray sheet."""
+    sub = sch.parent / "sub"
+    sub.mkdir()
+    (sub / "sheet2.kicad_sch").write_bytes(fixture_bytes[SCH_FIXTURE])
+    (sub / "io.kicad_sch").write_bytes(fixture_bytes[IO_FIXTURE])
+    (sch.parent / "stray.kicad_sch").write_bytes(fixture_bytes[SCH_FIXTURE])
+    _add_sheet(sch, "sub/sheet2.kicad_sch")
+    _add_sheet(sub / "sheet2.kicad_sch", "io.kicad_sch", prop="Sheet file")
+    return pro
+
+
+def test_rename_net_project(
+    project_tree: Path, fixture_bytes: dict[Path, bytes]
+) -> None:
+    root = project_tree.parent
+    sub = root / "sub"
+    result = kicad_helpers.rename_net_project(str(project_tree), "SPI1_SCK", "SPI_CLK")
+    assert result.startswith("Renamed 2 label(s) from 'SPI1_SCK' to 'SPI_CLK' in 2 of 3")
+    assert '"SPI_CLK"' in (root / "test.kicad_sch").read_text()
+    assert '"SPI_CLK"' in (sub / "sheet2.kicad_sch").read_text()
+    assert (sub / "io.kicad_sch").read_bytes() == fixture_bytes[IO_FIXTURE]
+    assert (root / "stray.kicad_sch").read_bytes() == fixture_bytes[SCH_FIXTURE]
+
+
+def test_rename_net_project_parses_each_sheet_once(
+    project_tree: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The hierarchy walk's parses are reused for the rename, not redone."""
+    monkeypatch.setattr(kicad_helpers, "_schematic_cache", OrderedDict())
+    monkeypatch.setattr(kicad_helpers, "_SCHEMATIC_CACHE_SIZE", 0)
+    parsed: list[str] = []
+    real_parse = kicad_helpers._parse_schematic
+
+    def spy(path: Path, st: os.stat_result) -> SexpDocument:
+        parsed.append(Path(path).name)
+        return real_parse(path, st)
+
+    monkeypatch.setattr(kicad_helpers, "_parse_schematic", spy)
+    kicad_helpers.rename_net_project(str(project_tree), "SPI1_SCK", "SPI_CLK")
+    assert sorted(parsed) == ["io.kicad_sch", "sheet2.kicad_sch", "test.kicad_sch"]
+
+
+def test_rename_net_project_missing_sheet(project_tree: Path) -> None:
+    (project_tree.parent / "sub" / "io.kicad_sch").unlink()
+    with pytest.raises(ValueError, match="not found"):
+        kicad_helpers.rename_net_project(str(project_tree), "SPI1_SCK", "SPI_CLK")
+    assert '"SPI_CLK"' not in (project_tree.parent / "test.kicad_sch").read_text()
+
+
+def test_rename_net_project_reports_partial_save(
+    project_tree: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    real_write = kicad_helpers.atomic_write_bytes
+
+    def fail_sheet2(path: Path, data: bytes) -> None:
+        if path.name == "sheet2.kicad_sch":
+            raise PermissionError("read-only")
+        real_write(path, data)
+
+    monkeypatch.setattr(kicad_helpers, "atomic_write_bytes", fail_sheet2)
+    with pytest.raises(ValueError) as excinfo:
+        kicad_helpers.rename_net_project(str(project_tree), "SPI1_SCK", "SPI_CLK")
+    message = str(excinfo.value)
+    assert "already saved: test.kicad_sch;" in message
+    assert f"not saved: {Path('sub', 'sheet2.kicad_sch')}" in message
+
+
+def test_rename_net_project_without_project_file(
+    sch: Path, fixture_bytes: dict[Path, bytes]
+) -> None:
+    """Without a .kicad_pro, only sheets directly in the directory are used."""
+    sub = sch.parent / "sub"
+    sub.mkdir()
+    (sub / "nested.kicad_sch").write_bytes(fixture_bytes[SCH_FIXTURE])
+    result = kicad_helpers.rename_net_project(str(sch.parent), "SPI1_SCK", "SPI_CLK")
+    assert "in 1 of 1 sheet(s)" in result
+    assert (sub / "nested.kicad_sch").read_bytes() == fixture_bytes[SCH_FIXTURE]
+
+
+def test_rename_net_project_no_sheets(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="No .kicad_sch files"):
+        kicad_helpers.rename_net_project(str(tmp_path), "A", "B")
+
+
 # ---------------------------------------------------------------------------
 # list_net_classes
 # ---------------------------------------------------------------------------
 
 
-def test_list_net_classes_default(pro: Path) -> None:
-    classes = kicad_helpers.list_net_classes(str(pro))
+def test_list_net_classes_default(pro_ro: Path) -> None:
+    classes = kicad_helpers.list_net_classes(str(pro_ro))
     assert len(classes) >= 1
     names = [c["name"] for c in classes]
     assert "Default" in names
 
 
-def test_list_net_classes_default_has_rules(pro: Path) -> None:
-    classes = kicad_helpers.list_net_classes(str(pro))
+def test_list_net_classes_default_has_rules(pro_ro: Path) -> None:
+    classes = kicad_helpers.list_net_classes(str(pro_ro))
     default = next(c for c in classes if c["name"] == "Default")
     assert "track_width" in default
     assert "clearance" in default
@@ -321,23 +707,15 @@ def test_update_net_class_create_new(pro: Path) -> None:
     result = kicad_helpers.update_net_class(str(pro), "USB")
     assert "Created" in result
     assert "USB" in result
-    # New class must have all 16 KiCad 9 required fields
-    import json
+    # New class must have all KiCad 9 required fields
     data = json.loads(pro.read_text())
     classes = data["net_settings"]["classes"]
     usb = next(c for c in classes if c["name"] == "USB")
-    for field in (
-        "bus_width", "clearance", "diff_pair_gap", "diff_pair_via_gap",
-        "diff_pair_width", "line_style", "microvia_diameter", "microvia_drill",
-        "pcb_color", "priority", "schematic_color", "track_width",
-        "via_diameter", "via_drill", "wire_width",
-    ):
-        assert field in usb, f"Missing field: {field}"
+    assert NET_CLASS_FIELDS <= usb.keys(), f"Missing: {NET_CLASS_FIELDS - usb.keys()}"
 
 
 def test_update_net_class_copies_default_fields(pro: Path) -> None:
     """New class inherits Default's field values (not hardcoded fallbacks)."""
-    import json
     # Give Default non-standard track_width
     kicad_helpers.update_net_class(str(pro), "Default", rules={"track_width": 0.5})
     kicad_helpers.update_net_class(str(pro), "USB")
@@ -353,7 +731,6 @@ def test_update_net_class_add_pattern(pro: Path) -> None:
     )
     assert "USB_D?" in result
     # Verify pattern in netclass_patterns[], not inside class dict
-    import json
     data = json.loads(pro.read_text())
     net_settings = data["net_settings"]
     patterns = net_settings.get("netclass_patterns", [])
@@ -386,7 +763,6 @@ def test_update_net_class_duplicate_pattern_noop(pro: Path) -> None:
     )
     assert "already present" in result
     # Confirm only one entry in netclass_patterns
-    import json
     data = json.loads(pro.read_text())
     patterns = data["net_settings"].get("netclass_patterns", [])
     matches = [
@@ -396,6 +772,16 @@ def test_update_net_class_duplicate_pattern_noop(pro: Path) -> None:
     assert len(matches) == 1
 
 
+def test_update_net_class_add_pattern_list(pro: Path) -> None:
+    result = kicad_helpers.update_net_class(
+        str(pro), "USB", add_pattern=["USB_D+", "USB_D-", "USB_D+"]
+    )
+    assert "already present" in result
+    classes = kicad_helpers.list_net_classes(str(pro))
+    usb = next(c for c in classes if c["name"] == "USB")
+    assert usb["patterns"] == ["USB_D+", "USB_D-"]
+
+
 def test_save_project_trailing_newline(pro: Path) -> None:
     """_save_project must write a trailing newline."""
     kicad_helpers.update_net_class(str(pro), "Default", rules={"track_width": 0.3})
@@ -403,49 +789,117 @@ def test_save_project_trailing_newline(pro: Path) -> None:
     assert content.endswith(b"\n"), "Project file must end with newline"
 
 
+def test_update_net_class_noop_skips_save(pro: Path) -> None:
+    kicad_helpers.update_net_class(str(pro), "USB", add_pattern="USB_D?")
+    os.utime(pro, ns=(0, 0))
+    kicad_helpers.update_net_class(str(pro), "USB", add_pattern="USB_D?")
+    assert pro.stat().st_mtime_ns == 0
+
+
+def test_save_project_atomic_preserves_mode(pro: Path) -> None:
+    pro.chmod(0o640)
+    kicad_helpers.update_net_class(str(pro), "Default", rules={"track_width": 0.3})
+    assert pro.stat().st_mode & 0o777 == 0o640
+    assert not pro.with_name(pro.name + ".tmp").exists()
+
+
+def test_load_project_caches_parse(pro: Path) -> None:
+    first, _ = kicad_helpers._load_project(str(pro), mutable=False)
+    second, _ = kicad_helpers._load_project(str(pro), mutable=False)
+    assert first is second
+    editable, _ = kicad_helpers._load_project(str(pro))
+    editable["net_settings"]["classes"].clear()
+    assert first["net_settings"]["classes"]
+
+    kicad_helpers.update_net_class(str(pro), "USB", add_pattern="USB_D?")
+    classes = kicad_helpers.list_net_classes(str(pro))
+    assert "USB_D?" in next(c for c in classes if c["name"] == "USB")["patterns"]
+
+
+def test_save_project_backends_same_data(
+    pro: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """orjson and the stdlib fallback write the same data; only the stdlib
+    path escapes non-ASCII, as the original json.dumps(indent=2) did."""
+    if kicad_helpers.orjson is None:
+        pytest.skip("orjson not installed")
+    data, _ = kicad_helpers._load_project(str(pro))
+    data["meta"]["filename"] = "Ünïcode.kicad_pro"
+    kicad_helpers._save_project(data, pro)
+    fast = pro.read_bytes()
+    monkeypatch.setattr(kicad_helpers, "orjson", None)
+    kicad_helpers._save_project(data, pro)
+    slow = pro.read_bytes()
+    assert json.loads(fast) == json.loads(slow) == data
+    assert '"Ünïcode.kicad_pro"'.encode() in fast
+    assert b'"\\u00dcn\\u00efcode.kicad_pro"' in slow
+    assert slow == (json.dumps(data, indent=2) + "\n").encode()
+
+
+def test_save_project_backends_format_floats_differently(
+    pro: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Small and large floats round-trip through both backends, but orjson
+    spells them differently from json.dumps."""
+    if kicad_helpers.orjson is None:
+        pytest.skip("orjson not installed")
+    data, _ = kicad_helpers._load_project(str(pro))
+    default = data["net_settings"]["classes"][0]
+    default["track_width"] = 1e-05
+    default["clearance"] = 0.00002
+    default["via_diameter"] = 1e20
+    kicad_helpers._save_project(data, pro)
+    fast = pro.read_bytes()
+    monkeypatch.setattr(kicad_helpers, "orjson", None)
+    kicad_helpers._save_project(data, pro)
+    slow = pro.read_bytes()
+    assert json.loads(fast) == json.loads(slow) == data
+    assert fast != slow
+    for fast_repr, slow_repr in (
+        (b"0.00001", b"1e-05"), (b"0.00002", b"2e-05"), (b"1e20", b"1e+20")
+    ):
+        assert fast_repr in fast and fast_repr not in slow
+        assert slow_repr in slow and slow_repr not in fast
+
+
 # ---------------------------------------------------------------------------
 # lib_symbols preservation (regression for kicad-sch-api v0.5.6 bugs)
 # ---------------------------------------------------------------------------
 
 
-def test_lib_symbols_preserved_after_update(sch: Path) -> None:
+_LIB_SYMBOL_RE = re.compile(rb'\(symbol "Device:(R|C|IC)"')
+
+
+def _assert_lib_symbols_preserved(raw: bytes) -> None:
+    """All three Device lib symbols must still be present (one regex pass)."""
+    assert set(_LIB_SYMBOL_RE.findall(raw)) >= {b"R", b"C", b"IC"}
+
+
+@pytest.mark.parametrize("fixture_name", ["sch", "sch_v9"])
+def test_lib_symbols_preserved_after_update(
+    fixture_name: str, request: pytest.FixtureRequest
+) -> None:
     """lib_symbols must survive round-trip through update_component."""
-    original = sch.read_text()
-    assert '(symbol "Device:R"' in original
+    path = request.getfixturevalue(fixture_name)
+    _assert_lib_symbols_preserved(path.read_bytes())
 
-    kicad_helpers.update_component(str(sch), "R1", {"Value": "4k7"})
+    kicad_helpers.update_component(str(path), "R1", {"Value": "4k7"})
 
-    saved = sch.read_text()
-    assert '(symbol "Device:R"' in saved
-    assert '(symbol "Device:C"' in saved
-    assert '(symbol "Device:IC"' in saved
+    _assert_lib_symbols_preserved(path.read_bytes())
 
 
 def test_lib_symbols_preserved_after_rename_net(sch: Path) -> None:
     """lib_symbols must survive round-trip through rename_net."""
     kicad_helpers.rename_net(str(sch), "SPI1_SCK", "SPI_CLK")
-    saved = sch.read_text()
-    assert '(symbol "Device:R"' in saved
-    assert '(symbol "Device:C"' in saved
-    assert '(symbol "Device:IC"' in saved
+    saved = sch.read_bytes()
+    _assert_lib_symbols_preserved(saved)
 
 
 def test_lib_symbols_preserved_after_info_update(sch: Path) -> None:
     """lib_symbols must survive round-trip through update_schematic_info."""
     kicad_helpers.update_schematic_info(str(sch), title="New Title")
-    saved = sch.read_text()
-    assert '(symbol "Device:R"' in saved
-    assert '(symbol "Device:C"' in saved
-    assert '(symbol "Device:IC"' in saved
-
-
-def test_kicad9_lib_symbols_preserved_after_update(sch_v9: Path) -> None:
-    """KiCad 9: lib_symbols must survive round-trip through update_component."""
-    kicad_helpers.update_component(str(sch_v9), "R1", {"Value": "4k7"})
-    saved = sch_v9.read_text()
-    assert '(symbol "Device:R"' in saved
-    assert '(symbol "Device:C"' in saved
-    assert '(symbol "Device:IC"' in saved
+    saved = sch.read_bytes()
+    _assert_lib_symbols_preserved(saved)
 
 
 # ---------------------------------------------------------------------------
@@ -466,6 +920,18 @@ def test_get_component_singleunit_no_units_key(sch_multi: Path) -> None:
     assert "_units" not in props
 
 
+def _unit_properties(path: Path, reference: str) -> list[dict[str, str]]:
+    """Re-parse ``path`` once; map property name → raw node text for each unit."""
+    doc = SexpDocument.load(path)
+    return [
+        {
+            name: doc.text[span.start:span.end]
+            for name, span in doc.property_spans(unit).items()
+        }
+        for unit in doc.find_symbol_units(reference)
+    ]
+
+
 def test_update_component_multiunit_updates_all(sch_multi: Path) -> None:
     """update_component must update all units of a multi-unit symbol."""
     result = kicad_helpers.update_component(
@@ -475,15 +941,10 @@ def test_update_component_multiunit_updates_all(sch_multi: Path) -> None:
     assert "3 units" in result
 
     # Re-parse and verify all 3 units have the new datasheet
-    from sexp_surgery import SexpDocument
-    doc = SexpDocument.load(Path(sch_multi))
-    units = doc.find_symbol_units("U2")
+    units = _unit_properties(sch_multi, "U2")
     assert len(units) == 3
-    for unit in units:
-        ds = doc.get_property(unit, "Datasheet")
-        assert ds is not None
-        text = doc.text[ds.start:ds.end]
-        assert "lm358-rev2" in text
+    for props in units:
+        assert "lm358-rev2" in props["Datasheet"]
 
 
 def test_update_component_multiunit_add_new_prop(sch_multi: Path) -> None:
@@ -493,15 +954,11 @@ def test_update_component_multiunit_add_new_prop(sch_multi: Path) -> None:
         {"MPN": "LM358ADR"},
     )
 
-    from sexp_surgery import SexpDocument
-    doc = SexpDocument.load(Path(sch_multi))
-    units = doc.find_symbol_units("U2")
+    units = _unit_properties(sch_multi, "U2")
     assert len(units) == 3
-    for unit in units:
-        mpn = doc.get_property(unit, "MPN")
-        assert mpn is not None, f"MPN missing on unit at offset {unit.start}"
-        text = doc.text[mpn.start:mpn.end]
-        assert "LM358ADR" in text
+    for idx, props in enumerate(units):
+        assert "MPN" in props, f"MPN missing on unit {idx}"
+        assert "LM358ADR" in props["MPN"]
 
 
 def test_update_component_multiunit_remove_prop(sch_multi: Path) -> None:
@@ -510,13 +967,10 @@ def test_update_component_multiunit_remove_prop(sch_multi: Path) -> None:
         str(sch_multi), "U2", {"Datasheet": None},
     )
 
-    from sexp_surgery import SexpDocument
-    doc = SexpDocument.load(Path(sch_multi))
-    units = doc.find_symbol_units("U2")
+    units = _unit_properties(sch_multi, "U2")
     assert len(units) == 3
-    for unit in units:
-        ds = doc.get_property(unit, "Datasheet")
-        assert ds is None, f"Datasheet still present on unit at offset {unit.start}"
+    for idx, props in enumerate(units):
+        assert "Datasheet" not in props, f"Datasheet still present on unit {idx}"
 
 
 def test_update_component_singleunit_unchanged(sch_multi: Path) -> None:
@@ -536,10 +990,8 @@ def test_units_metadata_not_written_on_roundtrip(sch_multi: Path) -> None:
     # Round-trip: pass entire props dict back to update_component
     kicad_helpers.update_component(str(sch_multi), "U2", props)
 
-    from sexp_surgery import SexpDocument
-    doc = SexpDocument.load(Path(sch_multi))
-    for unit in doc.find_symbol_units("U2"):
-        assert doc.get_property(unit, "_units") is None
+    for unit_props in _unit_properties(sch_multi, "U2"):
+        assert "_units" not in unit_props
 
 
 def test_update_component_multiunit_multiple_props(sch_multi: Path) -> None:
@@ -549,14 +1001,8 @@ def test_update_component_multiunit_multiple_props(sch_multi: Path) -> None:
         {"Value": "LM358B", "MPN": "LM358ADR"},
     )
 
-    from sexp_surgery import SexpDocument
-    doc = SexpDocument.load(Path(sch_multi))
-    units = doc.find_symbol_units("U2")
+    units = _unit_properties(sch_multi, "U2")
     assert len(units) == 3
-    for unit in units:
-        val = doc.get_property(unit, "Value")
-        assert val is not None
-        assert "LM358B" in doc.text[val.start:val.end]
-        mpn = doc.get_property(unit, "MPN")
-        assert mpn is not None
-        assert "LM358ADR" in doc.text[mpn.start:mpn.end]
+    for props in units:
+        assert "LM358B" in props["Value"]
+        assert "LM358ADR" in props["MPN"]
@@ -8,13 +8,11 @@ justify entries, and fields_autoplaced.
 from __future__ import annotations
 
 import difflib
-import shutil
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
 
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
 import kicad_helpers
 from sexp_surgery import SexpDocument
 
@@ -26,80 +24,73 @@ V9_FIXTURE = FIXTURES / "test_schematic_v9.kicad_sch"
 
 
 @pytest.fixture
-def io_sch(tmp_path: Path) -> Path:
+def io_sch(tmp_path: Path, fixture_bytes: dict[Path, bytes]) -> Path:
     dest = tmp_path / "IO.kicad_sch"
-    shutil.copy(IO_FIXTURE, dest)
+    dest.write_bytes(fixture_bytes[IO_FIXTURE])
     return dest
 
 
 @pytest.fixture
-def pic_sch(tmp_path: Path) -> Path:
+def pic_sch(tmp_path: Path, fixture_bytes: dict[Path, bytes]) -> Path:
     dest = tmp_path / "pic_programmer.kicad_sch"
-    shutil.copy(PIC_FIXTURE, dest)
+    dest.write_bytes(fixture_bytes[PIC_FIXTURE])
     return dest
 
 
 @pytest.fixture
-def v6_sch(tmp_path: Path) -> Path:
+def v6_sch(tmp_path: Path, fixture_bytes: dict[Path, bytes]) -> Path:
     dest = tmp_path / "test.kicad_sch"
-    shutil.copy(V6_FIXTURE, dest)
+    dest.write_bytes(fixture_bytes[V6_FIXTURE])
     return dest
 
 
 @pytest.fixture
-def v9_sch(tmp_path: Path) -> Path:
+def v9_sch(tmp_path: Path, fixture_bytes: dict[Path, bytes]) -> Path:
     dest = tmp_path / "test_v9.kicad_sch"
-    shutil.copy(V9_FIXTURE, dest)
+    dest.write_bytes(fixture_bytes[V9_FIXTURE])
     return dest
 
 
 # ---------------------------------------------------------------------------
-# Bug #1: Mirror flags preserved
+# Bugs #1, #2, #6, #7: flags and labels survive an edit
 # ---------------------------------------------------------------------------
 
+# Markers that must keep their counts across a property edit in IO.kicad_sch
+IO_MARKERS = {
+    "mirror": (b"(mirror",),
+    "dnp": (b"(dnp yes)", b"(dnp no)"),
+    "justify": (b"(justify",),
+    "fields_autoplaced": (b"(fields_autoplaced yes)", b"(fields_autoplaced no)"),
+    "hierarchical_label": (b"(hierarchical_label",),
+}
 
-def test_mirror_flags_preserved_after_edit(io_sch: Path) -> None:
-    """Mirror flags (mirror x) / (mirror y) must survive any property edit."""
-    original = io_sch.read_text()
-    mirror_count_before = original.count("(mirror")
 
-    # Find a component to edit
-    comps = kicad_helpers.list_components(str(io_sch))
+@pytest.fixture(scope="module")
+def io_edited(
+    tmp_path_factory: pytest.TempPathFactory, fixture_bytes: dict[Path, bytes]
+) -> tuple[bytes, bytes]:
+    """IO.kicad_sch before and after one Value edit, shared by the marker tests."""
+    dest = tmp_path_factory.mktemp("io_edited") / "IO.kicad_sch"
+    original = fixture_bytes[IO_FIXTURE]
+    dest.write_bytes(original)
+    comps = kicad_helpers.list_components(str(dest))
     assert len(comps) > 0
-    ref = comps[0]["reference"]
-    kicad_helpers.update_component(str(io_sch), ref, {"Value": "EDITED_VALUE"})
-
-    modified = io_sch.read_text()
-    mirror_count_after = modified.count("(mirror")
-    assert mirror_count_after == mirror_count_before, (
-        f"Mirror flags changed: {mirror_count_before} -> {mirror_count_after}"
+    kicad_helpers.update_component(
+        str(dest), comps[0]["reference"], {"Value": "EDITED_VALUE"}
     )
+    return original, dest.read_bytes()
 
 
-# ---------------------------------------------------------------------------
-# Bug #2: DNP flags preserved
-# ---------------------------------------------------------------------------
-
-
-def test_dnp_flags_preserved_after_edit(io_sch: Path) -> None:
-    """DNP flags must not be reset to (dnp no)."""
-    original = io_sch.read_text()
-    dnp_yes_before = original.count("(dnp yes)")
-    dnp_no_before = original.count("(dnp no)")
-
-    comps = kicad_helpers.list_components(str(io_sch))
-    ref = comps[0]["reference"]
-    kicad_helpers.update_component(str(io_sch), ref, {"Value": "EDITED"})
-
-    modified = io_sch.read_text()
-    dnp_yes_after = modified.count("(dnp yes)")
-    dnp_no_after = modified.count("(dnp no)")
-    assert dnp_yes_after == dnp_yes_before, (
-        f"(dnp yes) count changed: {dnp_yes_before} -> {dnp_yes_after}"
-    )
-    assert dnp_no_after == dnp_no_before, (
-        f"(dnp no) count changed: {dnp_no_before} -> {dnp_no_after}"
-    )
+@pytest.mark.parametrize("markers", IO_MARKERS.values(), ids=IO_MARKERS.keys())
+def test_markers_preserved_after_edit(
+    io_edited: tuple[bytes, bytes], markers: tuple[bytes, ...]
+) -> None:
+    """Mirror, dnp, justify, fields_autoplaced and hierarchical labels must
+    survive any property edit."""
+    original, modified = io_edited
+    for marker in markers:
+        before, after = original.count(marker), modified.count(marker)
+        assert after == before, f"{marker!r} count changed: {before} -> {after}"
 
 
 # ---------------------------------------------------------------------------
@@ -109,16 +100,14 @@ def test_dnp_flags_preserved_after_edit(io_sch: Path) -> None:
 
 def test_global_labels_preserved_after_edit(pic_sch: Path) -> None:
     """Global labels (global_label ...) must not be deleted on edit."""
-    original = pic_sch.read_text()
-    gl_count_before = original.count("(global_label")
+    gl_count_before = pic_sch.read_bytes().count(b"(global_label")
 
     comps = kicad_helpers.list_components(str(pic_sch))
     assert len(comps) > 0
     ref = comps[0]["reference"]
     kicad_helpers.update_component(str(pic_sch), ref, {"Value": "EDITED"})
 
-    modified = pic_sch.read_text()
-    gl_count_after = modified.count("(global_label")
+    gl_count_after = pic_sch.read_bytes().count(b"(global_label")
     assert gl_count_after == gl_count_before, (
         f"Global labels changed: {gl_count_before} -> {gl_count_after}"
     )
@@ -132,10 +121,10 @@ def test_global_label_rename(pic_sch: Path) -> None:
     # Get first global label text
     first_text = doc.text[glabels[0].start:glabels[0].end]
     # Extract the label text from the first quoted string
-    import re
-    m = re.search(r'"([^"]+)"', first_text)
-    assert m, "Could not find label text"
-    old_name = m.group(1)
+    q1 = first_text.find('"')
+    q2 = first_text.find('"', q1 + 1)
+    assert 0 <= q1 < q2 - 1, "Could not find label text"
+    old_name = first_text[q1 + 1:q2]
 
     result = kicad_helpers.rename_net(str(pic_sch), old_name, "RENAMED_NET")
     assert "Renamed" in result
@@ -163,51 +152,30 @@ def test_string_escaping_not_corrupted(v6_sch: Path) -> None:
 
 
 # ---------------------------------------------------------------------------
-# Bug #6: Text justification preserved
+# Round-trip diff tests
 # ---------------------------------------------------------------------------
 
 
-def test_justify_entries_preserved(io_sch: Path) -> None:
-    """All justify variants must survive any edit."""
-    original = io_sch.read_text()
-    justify_count_before = original.count("(justify")
-
-    comps = kicad_helpers.list_components(str(io_sch))
-    ref = comps[0]["reference"]
-    kicad_helpers.update_component(str(io_sch), ref, {"Value": "EDITED"})
+def _changed_lines(original: str, modified: str) -> Iterator[str]:
+    """Yield the added and removed lines of a context-free unified diff.
 
-    modified = io_sch.read_text()
-    justify_count_after = modified.count("(justify")
-    assert justify_count_after == justify_count_before, (
-        f"Justify entries changed: {justify_count_before} -> {justify_count_after}"
+    The common leading and trailing lines are trimmed first, so difflib only
+    matches the window around the edits instead of the whole file.
+    """
+    a, b = original.splitlines(), modified.splitlines()
+    limit = min(len(a), len(b))
+    head = 0
+    while head < limit and a[head] == b[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and a[-1 - tail] == b[-1 - tail]:
+        tail += 1
+    diff = difflib.unified_diff(
+        a[head:len(a) - tail], b[head:len(b) - tail], lineterm="", n=0
     )
-
-
-# ---------------------------------------------------------------------------
-# Bug #7: fields_autoplaced preserved
-# ---------------------------------------------------------------------------
-
-
-def test_fields_autoplaced_preserved(io_sch: Path) -> None:
-    """fields_autoplaced value must not change."""
-    original = io_sch.read_text()
-    fa_yes_before = original.count("(fields_autoplaced yes)")
-    fa_no_before = original.count("(fields_autoplaced no)")
-
-    comps = kicad_helpers.list_components(str(io_sch))
-    ref = comps[0]["reference"]
-    kicad_helpers.update_component(str(io_sch), ref, {"Value": "EDITED"})
-
-    modified = io_sch.read_text()
-    fa_yes_after = modified.count("(fields_autoplaced yes)")
-    fa_no_after = modified.count("(fields_autoplaced no)")
-    assert fa_yes_after == fa_yes_before
-    assert fa_no_after == fa_no_before
-
-
-# ---------------------------------------------------------------------------
-# Round-trip diff tests
-# ---------------------------------------------------------------------------
+    for line in diff:
+        if line[:1] in ("+", "-") and not line.startswith(("--- ", "+++ ")):
+            yield line
 
 
 def test_roundtrip_no_unintended_changes_v6(v6_sch: Path) -> None:
@@ -216,13 +184,7 @@ def test_roundtrip_no_unintended_changes_v6(v6_sch: Path) -> None:
     kicad_helpers.update_component(str(v6_sch), "R1", {"Value": "4k7"})
     modified = v6_sch.read_text()
 
-    diff = list(difflib.unified_diff(
-        original.splitlines(), modified.splitlines(), lineterm=""
-    ))
-    changed_lines = [l for l in diff if l.startswith("+") or l.startswith("-")]
-    for line in changed_lines:
-        if line.startswith("--- ") or line.startswith("+++ "):
-            continue
+    for line in _changed_lines(original, modified):
         assert "10k" in line or "4k7" in line, f"Unexpected changed line: {line!r}"
 
 
@@ -232,13 +194,7 @@ def test_roundtrip_no_unintended_changes_v9(v9_sch: Path) -> None:
     kicad_helpers.update_component(str(v9_sch), "R1", {"Value": "4k7"})
     modified = v9_sch.read_text()
 
-    diff = list(difflib.unified_diff(
-        original.splitlines(), modified.splitlines(), lineterm=""
-    ))
-    changed_lines = [l for l in diff if l.startswith("+") or l.startswith("-")]
-    for line in changed_lines:
-        if line.startswith("--- ") or line.startswith("+++ "):
-            continue
+    for line in _changed_lines(original, modified):
         assert "10k" in line or "4k7" in line, f"Unexpected changed line: {line!r}"
 
 
@@ -253,37 +209,12 @@ def test_roundtrip_demo_file_minimal_diff(io_sch: Path) -> None:
     kicad_helpers.update_component(str(io_sch), ref, {"Value": "ROUNDTRIP_TEST"})
     modified = io_sch.read_text()
 
-    diff = list(difflib.unified_diff(
-        original.splitlines(), modified.splitlines(), lineterm=""
-    ))
-    changed_lines = [l for l in diff
-                     if (l.startswith("+") or l.startswith("-"))
-                     and not l.startswith("--- ") and not l.startswith("+++ ")]
-    for line in changed_lines:
+    for line in _changed_lines(original, modified):
         assert old_value in line or "ROUNDTRIP_TEST" in line, (
             f"Unexpected changed line: {line!r}"
         )
 
 
-# ---------------------------------------------------------------------------
-# Hierarchical labels preserved
-# ---------------------------------------------------------------------------
-
-
-def test_hierarchical_labels_preserved(io_sch: Path) -> None:
-    """Hierarchical labels must survive any edit."""
-    original = io_sch.read_text()
-    hl_count_before = original.count("(hierarchical_label")
-
-    comps = kicad_helpers.list_components(str(io_sch))
-    ref = comps[0]["reference"]
-    kicad_helpers.update_component(str(io_sch), ref, {"Value": "EDITED"})
-
-    modified = io_sch.read_text()
-    hl_count_after = modified.count("(hierarchical_label")
-    assert hl_count_after == hl_count_before
-
-
 # ---------------------------------------------------------------------------
 # Large file: all components survive round-trip
 # ---------------------------------------------------------------------------
@@ -8,12 +8,10 @@ from pathlib import Path
 
 import pytest
 
-# Ensure project root on path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 import server as _server_module
 
 _KNOWN_TOOLS = _server_module._KNOWN_TOOLS
+_parse_disabled_tools = _server_module._parse_disabled_tools
 
 
 def _reload_server(monkeypatch: pytest.MonkeyPatch, env_value: str | None) -> object:
@@ -36,15 +34,18 @@ def _reload_server(monkeypatch: pytest.MonkeyPatch, env_value: str | None) -> ob
 # ---------------------------------------------------------------------------
 
 
-def test_known_tools_set_has_seven_tools() -> None:
-    """Sanity: confirm 7 known tools are declared."""
-    assert len(_KNOWN_TOOLS) == 7
+def test_known_tools_set_has_ten_tools() -> None:
+    """Sanity: confirm 10 known tools are declared."""
+    assert len(_KNOWN_TOOLS) == 10
     expected = {
         "list_components",
         "get_component",
         "update_component",
+        "bulk_update_components",
         "update_schematic_info",
         "rename_net",
+        "bulk_rename_nets",
+        "rename_net_project",
         "list_net_classes",
         "update_net_class",
     }
@@ -57,56 +58,86 @@ def test_known_tools_set_has_seven_tools() -> None:
 
 
 def test_default_no_env_enables_all(monkeypatch: pytest.MonkeyPatch) -> None:
-    """No DISABLED_TOOLS env var -> all 7 tools enabled."""
+    """No DISABLED_TOOLS env var -> all 10 tools enabled."""
     mod = _reload_server(monkeypatch, None)
     assert set(mod._enabled.keys()) == _KNOWN_TOOLS
     assert all(mod._enabled.values()), "All tools should be enabled by default"
 
 
-def test_empty_env_enables_all(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_empty_env_enables_all() -> None:
     """DISABLED_TOOLS="" -> all tools enabled."""
-    mod = _reload_server(monkeypatch, "")
-    assert all(mod._enabled.values())
+    enabled = _parse_disabled_tools("", _KNOWN_TOOLS)
+    assert all(enabled.values())
 
 
-def test_disable_single_tool(monkeypatch: pytest.MonkeyPatch) -> None:
-    """DISABLED_TOOLS=rename_net -> 6 enabled, rename_net disabled."""
-    mod = _reload_server(monkeypatch, "rename_net")
-    assert mod._enabled["rename_net"] is False
-    enabled_count = sum(1 for v in mod._enabled.values() if v)
+def test_disable_single_tool() -> None:
+    """DISABLED_TOOLS=rename_net -> only rename_net disabled."""
+    enabled = _parse_disabled_tools("rename_net", _KNOWN_TOOLS)
+    assert enabled["rename_net"] is False
+    enabled_count = sum(1 for v in enabled.values() if v)
     assert enabled_count == len(_KNOWN_TOOLS) - 1
 
 
-def test_disable_multiple_tools(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_disable_multiple_tools() -> None:
     """Comma-separated list disables correct tools."""
-    mod = _reload_server(monkeypatch, "rename_net,update_net_class")
-    assert mod._enabled["rename_net"] is False
-    assert mod._enabled["update_net_class"] is False
-    enabled_count = sum(1 for v in mod._enabled.values() if v)
+    enabled = _parse_disabled_tools("rename_net,update_net_class", _KNOWN_TOOLS)
+    assert enabled["rename_net"] is False
+    assert enabled["update_net_class"] is False
+    enabled_count = sum(1 for v in enabled.values() if v)
     assert enabled_count == len(_KNOWN_TOOLS) - 2
 
 
-def test_unknown_tool_warns(
-    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
-) -> None:
+def test_unknown_tool_warns(capsys: pytest.CaptureFixture) -> None:
     """Unknown tool name in DISABLED_TOOLS -> warning on stderr."""
-    _reload_server(monkeypatch, "ghost_tool")
+    _parse_disabled_tools("ghost_tool", _KNOWN_TOOLS)
     captured = capsys.readouterr()
     assert "ghost_tool" in captured.err
     assert "WARNING" in captured.err or "unknown" in captured.err.lower()
 
 
-def test_unknown_tool_does_not_affect_known(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_unknown_tool_does_not_affect_known() -> None:
     """Unknown tool in DISABLED_TOOLS must not alter known tool states."""
-    mod = _reload_server(monkeypatch, "ghost_tool")
-    assert set(mod._enabled.keys()) == _KNOWN_TOOLS
-    assert all(mod._enabled.values())
+    enabled = _parse_disabled_tools("ghost_tool", _KNOWN_TOOLS)
+    assert set(enabled.keys()) == _KNOWN_TOOLS
+    assert all(enabled.values())
 
 
-def test_whitespace_handling(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_whitespace_handling() -> None:
     """Whitespace around tool names is stripped correctly."""
-    mod = _reload_server(monkeypatch, " rename_net , update_net_class ")
-    assert mod._enabled["rename_net"] is False
-    assert mod._enabled["update_net_class"] is False
-    enabled_count = sum(1 for v in mod._enabled.values() if v)
+    enabled = _parse_disabled_tools(" rename_net , update_net_class ", _KNOWN_TOOLS)
+    assert enabled["rename_net"] is False
+    assert enabled["update_net_class"] is False
+    enabled_count = sum(1 for v in enabled.values() if v)
     assert enabled_count == len(_KNOWN_TOOLS) - 2
+
+
+def test_env_var_applied_on_import(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The module-level _enabled map is built from DISABLED_TOOLS at import."""
+    mod = _reload_server(monkeypatch, "rename_net")
+    assert mod._enabled == _parse_disabled_tools("rename_net", _KNOWN_TOOLS)
+
+
+def test_helpers_imported_on_first_tool_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Importing server must not pull in kicad_helpers until a tool needs it."""
+    monkeypatch.delitem(sys.modules, "kicad_helpers", raising=False)
+    mod = _reload_server(monkeypatch, None)
+    assert "kicad_helpers" not in sys.modules
+    assert mod._helpers() is sys.modules["kicad_helpers"]
+
+
+def test_bulk_rename_nets_tool(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, fixture_bytes: dict[Path, bytes]
+) -> None:
+    """bulk_rename_nets is exposed as a tool and maps ValueError to an error string."""
+    src = Path(__file__).parent / "fixtures" / "IO.kicad_sch"
+    sch = tmp_path / "IO.kicad_sch"
+    sch.write_bytes(fixture_bytes[src])
+    mod = _reload_server(monkeypatch, None)
+    result = mod.bulk_rename_nets(str(sch), {"MISO": "MOSI", "MOSI": "MISO"})
+    assert "Renamed" in result
+    assert sch.read_bytes() != fixture_bytes[src]
+    missing = mod.bulk_rename_nets(str(tmp_path / "missing.kicad_sch"), {"A": "B"})
+    assert missing.startswith("Error: ")
+
+    mod = _reload_server(monkeypatch, "bulk_rename_nets")
+    assert not hasattr(mod, "bulk_rename_nets")
@@ -1,12 +1,21 @@
 """Unit tests for sexp_surgery.py core engine."""
 from __future__ import annotations
 
-import shutil
+from functools import lru_cache
 from pathlib import Path
 
 import pytest
 
-from sexp_surgery import SexpDocument, SexpSpan
+import sexpdata
+
+from sexp_surgery import (
+    SexpDocument,
+    SexpSpan,
+    _build_span_index,
+    _has_child_key,
+    _parse,
+    _parse_fast,
+)
 
 FIXTURES = Path(__file__).parent / "fixtures"
 FIXTURE_V6 = FIXTURES / "test_schematic.kicad_sch"
@@ -14,25 +23,42 @@ FIXTURE_V9 = FIXTURES / "test_schematic_v9.kicad_sch"
 
 
 @pytest.fixture(params=["v6", "v9"])
-def fixture_path(request, tmp_path):
-    """Parametrize over both KiCad 6 and 9 fixtures, copied to tmp so we can modify."""
+def fixture_path(request, tmp_path, fixture_bytes):
+    """Parametrize over both KiCad 6 and 9 fixtures, written to tmp so we can modify."""
     src = FIXTURE_V6 if request.param == "v6" else FIXTURE_V9
     dest = tmp_path / src.name
-    shutil.copy(src, dest)
+    dest.write_bytes(fixture_bytes[src])
     return dest
 
 
+@lru_cache(maxsize=4)
+def _cached_parse(path_str: str, mtime_ns: int) -> SexpDocument:
+    """Parse a fixture once per file version; tests get fork()s of it."""
+    return SexpDocument.load(Path(path_str))
+
+
+def _shared_doc(src: Path) -> SexpDocument:
+    """Return a fork of the shared parse of src, for tests that never save."""
+    return _cached_parse(str(src), src.stat().st_mtime_ns).fork()
+
+
+@pytest.fixture(params=["v6", "v9"])
+def doc(request):
+    """Parametrize over both fixtures for read-only tests, sharing one parse each."""
+    return _shared_doc(FIXTURE_V6 if request.param == "v6" else FIXTURE_V9)
+
+
 @pytest.fixture
-def doc_v6(tmp_path):
+def doc_v6(tmp_path, fixture_bytes):
     dest = tmp_path / FIXTURE_V6.name
-    shutil.copy(FIXTURE_V6, dest)
+    dest.write_bytes(fixture_bytes[FIXTURE_V6])
     return SexpDocument.load(dest), dest
 
 
 @pytest.fixture
-def doc_v9(tmp_path):
+def doc_v9(tmp_path, fixture_bytes):
     dest = tmp_path / FIXTURE_V9.name
-    shutil.copy(FIXTURE_V9, dest)
+    dest.write_bytes(fixture_bytes[FIXTURE_V9])
     return SexpDocument.load(dest), dest
 
 
@@ -57,8 +83,7 @@ def test_load_parses_file_v9():
 # 2. test_span_tracking_accuracy
 # ---------------------------------------------------------------------------
 
-def test_span_tracking_accuracy(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_span_tracking_accuracy(doc):
     text = doc.text
     for node_id, span in doc.spans.items():
         excerpt = text[span.start:span.end]
@@ -70,22 +95,86 @@ def test_span_tracking_accuracy(fixture_path):
         )
 
 
+def test_span_tracking_skips_parens_in_strings(tmp_path):
+    path = tmp_path / "quoted.kicad_sch"
+    path.write_text(
+        '(kicad_sch (title_block (title "a (b\\" ) c")) (label "x)")\n'
+        '  (symbol (property "Value" "(" (at 0 0 0))))\n'
+    )
+    doc = SexpDocument.load(path)
+    excerpts = sorted(doc.text[s.start:s.end] for s in doc.spans.values())
+    assert excerpts == [
+        '(label "x)")',
+        '(property "Value" "(" (at 0 0 0))',
+        '(symbol (property "Value" "(" (at 0 0 0)))',
+        '(title "a (b\\" ) c")',
+        '(title_block (title "a (b\\" ) c"))',
+    ]
+
+
+@pytest.mark.parametrize("name", sorted(p.name for p in FIXTURES.glob("*.kicad_sch")))
+def test_parse_matches_sexpdata(name):
+    text = (FIXTURES / name).read_text(encoding="utf-8")
+    tree, spans = _parse_fast(text)
+    reference = sexpdata.loads(text)
+    assert tree == reference
+    expected = _build_span_index(text, reference)
+
+    def layout(index):
+        return sorted((s.start, s.end, s.depth, s.parent_index) for s in index.values())
+
+    assert layout(spans) == layout(expected)
+    assert all(id(s.node) == key for key, s in spans.items())
+
+
+def test_parse_fast_atoms_match_sexpdata():
+    """Escapes, numbers and bare symbols stay on the fast path and match sexpdata."""
+    text = '(kicad_sch (a "x\\ty\\q") (b 1 -2.5 1e3 t))'
+    tree, _ = _parse_fast(text)
+    expected = sexpdata.loads(text)
+    assert tree == expected
+    assert [type(x) for x in tree[2]] == [type(x) for x in expected[2]]
+
+
+@pytest.mark.parametrize("text", [
+    "(kicad_sch (a nil) (b 'c))",
+    "(kicad_sch (a [1 2]))",
+    '(kicad_sch (a "open))',
+])
+def test_parse_falls_back_to_sexpdata(text, monkeypatch):
+    try:
+        expected = sexpdata.loads(text)
+    except Exception as exc:
+        expected, error = None, type(exc)
+
+    calls = []
+    real_loads = sexpdata.loads
+
+    def spy(*args, **kwargs):
+        calls.append(args[0])
+        return real_loads(*args, **kwargs)
+
+    monkeypatch.setattr(sexpdata, "loads", spy)
+    if expected is None:
+        with pytest.raises(error):
+            _parse(text)
+    else:
+        tree, _ = _parse(text)
+        assert tree == expected
+        assert [type(x) for x in tree[1]] == [type(x) for x in expected[1]]
+    assert calls == [text]
+
+
 # ---------------------------------------------------------------------------
 # 3. test_find_all_symbols — 3 schematic symbols per fixture
 # ---------------------------------------------------------------------------
 
-def test_find_all_symbols(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_find_all_symbols(doc):
     # find_all("symbol") returns ALL symbol nodes including lib_symbols children
     # find_symbol checks for lib_id to filter schematic instances
-    symbols = [
-        s for s in doc.find_all("symbol")
-        if any(
-            isinstance(c, list) and c and str(c[0]) == "lib_id"
-            for c in s.node[1:]
-        )
-    ]
+    symbols = [s for s in doc.find_all("symbol") if _has_child_key(s.node, "lib_id")]
     assert len(symbols) == 3, f"Expected 3 schematic symbols, got {len(symbols)}"
+    assert symbols == doc.placed_symbols()
 
 
 # ---------------------------------------------------------------------------
@@ -93,8 +182,7 @@ def test_find_all_symbols(fixture_path):
 # ---------------------------------------------------------------------------
 
 @pytest.mark.parametrize("ref", ["R1", "C1", "U1"])
-def test_find_symbol_by_reference(fixture_path, ref):
-    doc = SexpDocument.load(fixture_path)
+def test_find_symbol_by_reference(doc, ref):
     span = doc.find_symbol(ref)
     assert span is not None, f"Symbol {ref} not found"
     assert isinstance(span, SexpSpan)
@@ -104,38 +192,62 @@ def test_find_symbol_by_reference(fixture_path, ref):
 # 5. test_find_symbol_missing
 # ---------------------------------------------------------------------------
 
-def test_find_symbol_missing(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_find_symbol_missing(doc):
     span = doc.find_symbol("Z99")
     assert span is None
 
 
+def test_property_spans_indexed_once(doc):
+    sym = doc.find_symbol("R1")
+    props = doc.property_spans(sym)
+    assert {"Reference", "Value", "Footprint"} <= props.keys()
+    assert doc.fork().property_spans(sym) is props
+    assert doc.get_property(sym, "Value") is props["Value"]
+
+
+def test_find_all_returns_copies_of_type_index(doc):
+    symbols = doc.find_all("symbol")
+    assert [s.start for s in symbols] == sorted(s.start for s in symbols)
+    symbols.clear()
+    assert doc.fork().find_all("symbol")
+    assert doc.find_all("no_such_node") == []
+
+
+def test_fork_shares_reference_index(doc):
+    span = doc.find_symbol("R1")
+    forked = doc.fork()
+    assert forked.find_symbol("R1") is span
+    assert forked._memo is doc._memo
+    forked.replace_span(span, "(x)")
+    assert forked.has_edits and not doc.has_edits
+
+
 # ---------------------------------------------------------------------------
 # 6. test_find_labels
 # ---------------------------------------------------------------------------
 
-def test_find_labels(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_find_labels(doc):
     labels = doc.find_labels("label")
     assert len(labels) == 1
     assert doc.text[labels[0].start:labels[0].start + 6] == "(label"
 
 
-def test_find_labels_by_text(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_find_labels_by_text(doc):
     labels = doc.find_labels("label", text="SPI1_SCK")
     assert len(labels) == 1
 
     labels_missing = doc.find_labels("label", text="NONEXISTENT")
     assert len(labels_missing) == 0
 
+    labels.clear()
+    assert doc.fork().find_labels("label", text="SPI1_SCK")
+
 
 # ---------------------------------------------------------------------------
 # 7. test_find_title_block
 # ---------------------------------------------------------------------------
 
-def test_find_title_block(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_find_title_block(doc):
     tb = doc.find_title_block()
     assert tb is not None
     assert doc.text[tb.start:tb.start + 12] == "(title_block"
@@ -145,8 +257,7 @@ def test_find_title_block(fixture_path):
 # 8. test_get_property
 # ---------------------------------------------------------------------------
 
-def test_get_property(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_get_property(doc):
     sym = doc.find_symbol("R1")
     assert sym is not None
     prop = doc.get_property(sym, "Value")
@@ -154,8 +265,7 @@ def test_get_property(fixture_path):
     assert str(prop.node[0]) == "property"
 
 
-def test_get_property_missing(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_get_property_missing(doc):
     sym = doc.find_symbol("R1")
     assert sym is not None
     prop = doc.get_property(sym, "NonExistentProp")
@@ -166,8 +276,7 @@ def test_get_property_missing(fixture_path):
 # 9. test_get_property_value_span
 # ---------------------------------------------------------------------------
 
-def test_get_property_value_span(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_get_property_value_span(doc):
     sym = doc.find_symbol("R1")
     assert sym is not None
     prop = doc.get_property(sym, "Value")
@@ -179,8 +288,7 @@ def test_get_property_value_span(fixture_path):
     assert doc.text[start:end] == '"10k"'
 
 
-def test_get_property_value_span_capacitor(fixture_path):
-    doc = SexpDocument.load(fixture_path)
+def test_get_property_value_span_capacitor(doc):
     sym = doc.find_symbol("C1")
     assert sym is not None
     prop = doc.get_property(sym, "Value")
@@ -202,19 +310,29 @@ def test_replace_span_single(doc_v6):
     new_text = original_text.replace('"Test Schematic"', '"New Title"')
     doc.replace_span(tb, new_text)
     doc.save(path)
-    result = path.read_text(encoding="utf-8")
-    assert '"New Title"' in result
-    assert '"Test Schematic"' not in result
+    result = path.read_bytes()
+    assert b'"New Title"' in result
+    assert b'"Test Schematic"' not in result
+
+
+def test_save_is_atomic_and_keeps_mode(doc_v6):
+    doc, path = doc_v6
+    path.chmod(0o640)
+    doc.replace_span(doc.find_title_block(), "(title_block)")
+    doc.save(path)
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert not path.with_name(path.name + ".tmp").exists()
+    assert b"(title_block)" in path.read_bytes()
 
 
 # ---------------------------------------------------------------------------
 # 11. test_replace_multiple_back_to_front
 # ---------------------------------------------------------------------------
 
-def test_replace_multiple_back_to_front(tmp_path):
+def test_replace_multiple_back_to_front(tmp_path, fixture_bytes):
     """Multiple replacements must all be applied correctly."""
     src = tmp_path / "test.kicad_sch"
-    shutil.copy(FIXTURE_V6, src)
+    src.write_bytes(fixture_bytes[FIXTURE_V6])
     doc = SexpDocument.load(src)
 
     r1_sym = doc.find_symbol("R1")
@@ -236,24 +354,41 @@ def test_replace_multiple_back_to_front(tmp_path):
     doc.replace_bytes(c1_vs[0], c1_vs[1], '"220nF"')
     doc.save(src)
 
-    result = src.read_text(encoding="utf-8")
-    assert '"4k7"' in result
-    assert '"220nF"' in result
-    assert '"10k"' not in result
-    assert '"100nF"' not in result
+    result = src.read_bytes()
+    assert b'"4k7"' in result
+    assert b'"220nF"' in result
+    assert b'"10k"' not in result
+    assert b'"100nF"' not in result
+
+
+def test_render_orders_inserts_and_rejects_overlap():
+    doc = SexpDocument("(a bc)", ["a"], {})
+    doc.replace_bytes(5, 5, " x")
+    doc.replace_bytes(5, 5, " y")
+    doc.replace_bytes(3, 5, "BC")
+    assert doc.render() == "(a BC y x)"
+    doc.replace_bytes(4, 6, "")
+    with pytest.raises(ValueError, match="Overlapping"):
+        doc.render()
 
 
 # ---------------------------------------------------------------------------
 # 12. test_roundtrip_no_change
 # ---------------------------------------------------------------------------
 
-def test_roundtrip_no_change(fixture_path):
-    """Load and save without edits — file must be byte-identical."""
-    original = fixture_path.read_text(encoding="utf-8")
-    doc = SexpDocument.load(fixture_path)
-    doc.save(fixture_path)
-    result = fixture_path.read_text(encoding="utf-8")
-    assert result == original
+@pytest.mark.parametrize("src", [FIXTURE_V6, FIXTURE_V9], ids=["v6", "v9"])
+def test_roundtrip_no_change(src):
+    """Load and render without edits — output must be byte-identical."""
+    doc = SexpDocument.load(src)
+    assert doc.render().encode("utf-8") == src.read_bytes()
+
+
+def test_roundtrip_save_no_change(tmp_path, fixture_bytes):
+    """Load and save() without edits — the file on disk must be byte-identical."""
+    dest = tmp_path / FIXTURE_V9.name
+    dest.write_bytes(fixture_bytes[FIXTURE_V9])
+    SexpDocument.load(dest).save(dest)
+    assert dest.read_bytes() == fixture_bytes[FIXTURE_V9]
 
 
 # ---------------------------------------------------------------------------
@@ -262,39 +397,32 @@ def test_roundtrip_no_change(fixture_path):
 
 def test_surgical_value_replace(fixture_path):
     """Change property value, only value bytes change."""
-    import difflib
-    original = fixture_path.read_text(encoding="utf-8")
-
     doc = SexpDocument.load(fixture_path)
+    original = doc.text
     sym = doc.find_symbol("C1")
     prop = doc.get_property(sym, "Value")
     vs = doc.get_property_value_span(prop)
     assert vs is not None
 
-    doc.replace_bytes(vs[0], vs[1], '"220nF"')
+    start, end, _ = vs
+    doc.replace_bytes(start, end, '"220nF"')
     doc.save(fixture_path)
     modified = fixture_path.read_text(encoding="utf-8")
 
-    diff = list(difflib.unified_diff(
-        original.splitlines(), modified.splitlines(), lineterm=""
-    ))
-    changed_lines = [l for l in diff if l.startswith("+") or l.startswith("-")]
-    # Only lines containing the old or new value should change
-    for line in changed_lines:
-        if line.startswith("--- ") or line.startswith("+++ "):
-            continue
-        assert "100nF" in line or "220nF" in line, (
-            f"Unexpected changed line: {line!r}"
-        )
+    # Everything outside the value span is untouched
+    new_end = start + len('"220nF"')
+    assert modified[:start] == original[:start]
+    assert modified[start:new_end] == '"220nF"'
+    assert modified[new_end:] == original[end:]
 
 
 # ---------------------------------------------------------------------------
 # 14. test_delete_span
 # ---------------------------------------------------------------------------
 
-def test_delete_span(tmp_path):
+def test_delete_span(tmp_path, fixture_bytes):
     src = tmp_path / "test.kicad_sch"
-    shutil.copy(FIXTURE_V6, src)
+    src.write_bytes(fixture_bytes[FIXTURE_V6])
     doc = SexpDocument.load(src)
 
     labels = doc.find_labels("label")
@@ -302,17 +430,15 @@ def test_delete_span(tmp_path):
     doc.delete_span(labels[0])
     doc.save(src)
 
-    result = src.read_text(encoding="utf-8")
-    assert "(label" not in result
+    assert b"(label" not in src.read_bytes()
 
 
 # ---------------------------------------------------------------------------
-# 15. test_kicad6_and_v9_both_work (parametrized via fixture_path)
+# 15. test_kicad6_and_v9_both_work (parametrized via doc)
 # ---------------------------------------------------------------------------
 
-def test_kicad6_and_v9_both_work(fixture_path):
+def test_kicad6_and_v9_both_work(doc):
     """Smoke test: basic operations work on both fixture versions."""
-    doc = SexpDocument.load(fixture_path)
     assert doc.find_symbol("R1") is not None
     assert doc.find_symbol("C1") is not None
     assert doc.find_symbol("U1") is not None
@@ -326,51 +452,46 @@ def test_kicad6_and_v9_both_work(fixture_path):
 
 def test_is_property_hidden_kicad6():
     """KiCad 6: hidden property uses bare `hide` symbol."""
-    doc = SexpDocument.load(FIXTURE_V6)
+    doc = _shared_doc(FIXTURE_V6)
     sym = doc.find_symbol("R1")
     assert sym is not None
 
     # Footprint and Datasheet are hidden, Reference and Value are not
-    ref_prop = doc.get_property(sym, "Reference")
-    val_prop = doc.get_property(sym, "Value")
-    fp_prop = doc.get_property(sym, "Footprint")
-    ds_prop = doc.get_property(sym, "Datasheet")
-
-    assert ref_prop is not None
-    assert val_prop is not None
-    assert fp_prop is not None
-    assert ds_prop is not None
+    props = doc.property_spans(sym)
+    assert {"Reference", "Value", "Footprint", "Datasheet"} <= props.keys()
 
-    assert not doc.is_property_hidden(ref_prop), "Reference should not be hidden"
-    assert not doc.is_property_hidden(val_prop), "Value should not be hidden"
-    assert doc.is_property_hidden(fp_prop), "Footprint should be hidden"
-    assert doc.is_property_hidden(ds_prop), "Datasheet should be hidden"
+    assert not doc.is_property_hidden(props["Reference"]), (
+        "Reference should not be hidden"
+    )
+    assert not doc.is_property_hidden(props["Value"]), "Value should not be hidden"
+    assert doc.is_property_hidden(props["Footprint"]), "Footprint should be hidden"
+    assert doc.is_property_hidden(props["Datasheet"]), "Datasheet should be hidden"
 
 
 def test_is_property_hidden_kicad9():
     """KiCad 9: hidden property uses `(hide yes)` form."""
-    doc = SexpDocument.load(FIXTURE_V9)
+    doc = _shared_doc(FIXTURE_V9)
     sym = doc.find_symbol("R1")
     assert sym is not None
 
-    ref_prop = doc.get_property(sym, "Reference")
-    val_prop = doc.get_property(sym, "Value")
-    fp_prop = doc.get_property(sym, "Footprint")
-    ds_prop = doc.get_property(sym, "Datasheet")
+    props = doc.property_spans(sym)
+    assert {"Reference", "Value", "Footprint", "Datasheet"} <= props.keys()
 
-    assert not doc.is_property_hidden(ref_prop), "Reference should not be hidden"
-    assert not doc.is_property_hidden(val_prop), "Value should not be hidden"
-    assert doc.is_property_hidden(fp_prop), "Footprint should be hidden"
-    assert doc.is_property_hidden(ds_prop), "Datasheet should be hidden"
+    assert not doc.is_property_hidden(props["Reference"]), (
+        "Reference should not be hidden"
+    )
+    assert not doc.is_property_hidden(props["Value"]), "Value should not be hidden"
+    assert doc.is_property_hidden(props["Footprint"]), "Footprint should be hidden"
+    assert doc.is_property_hidden(props["Datasheet"]), "Datasheet should be hidden"
 
 
 # ---------------------------------------------------------------------------
 # Additional edge case: insert_before_end
 # ---------------------------------------------------------------------------
 
-def test_insert_before_end(tmp_path):
+def test_insert_before_end(tmp_path, fixture_bytes):
     src = tmp_path / "test.kicad_sch"
-    shutil.copy(FIXTURE_V6, src)
+    src.write_bytes(fixture_bytes[FIXTURE_V6])
     doc = SexpDocument.load(src)
 
     tb = doc.find_title_block()
@@ -378,7 +499,7 @@ def test_insert_before_end(tmp_path):
     doc.insert_before_end(tb, '\n    (comment 1 "hello")')
     doc.save(src)
 
-    result = src.read_text(encoding="utf-8")
-    assert '(comment 1 "hello")' in result
+    result = src.read_bytes()
+    assert b'(comment 1 "hello")' in result
     # The title_block closing paren should still be there
-    assert "(title_block" in result
+    assert b"(title_block" in result